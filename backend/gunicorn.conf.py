@@ -0,0 +1,18 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ------------ GUNICORN ------------ #
+# Threaded workers: a /chat, /revise or /summarize stream only holds one thread
+# while it waits on the OpenAI stream, so a replica can serve hundreds of
+# streams at once while the JSON endpoints keep responding on the other threads.
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8080")
+worker_class = "gthread"
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "100"))
+# threaded workers heartbeat from their main loop, so long streams never hit this
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "300"))
+keepalive = 5
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "debug")
@@ -0,0 +1,68 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ------------ BACKGROUND JOBS ------------ #
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_DIR = os.getenv("JOB_DIR", os.path.join(tempfile.gettempdir(), "fair-jobs"))
+
+job_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="fair-job")
+# short follow-up work (chat compaction) that must not queue behind summarize jobs
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", "4"))
+task_executor = ThreadPoolExecutor(max_workers=TASK_WORKERS, thread_name_prefix="fair-task")
+# how often a process refreshes the heartbeat of the jobs it holds, and how long
+# a queued or running job may go without one before it is considered lost
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "15"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "120"))
+
+
+def create_job_dir(job_id: str) -> str:
+    """Create the directory a job's uploaded files live in until the job finishes."""
+    path = os.path.join(JOB_DIR, job_id)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def remove_job_dir(job_id: str):
+    shutil.rmtree(os.path.join(JOB_DIR, job_id), ignore_errors=True)
+
+
+def run_in_background(app, fn, *args, executor=job_executor):
+    """
+    Run `fn(*args)` on `executor` (the job worker pool by default) inside an application context.
+
+    Flask-SQLAlchemy removes the database session when the context ends, so
+    each job gets its own session. Unexpected errors are logged rather than lost.
+    """
+    def run():
+        with app.app_context():
+            try:
+                fn(*args)
+            except Exception:
+                traceback.print_exc()
+
+    return executor.submit(run)
+
+
+def start_heartbeat(app, beat, interval: float):
+    """Call `beat()` every `interval` seconds on a daemon thread, inside an application context."""
+    def run():
+        while True:
+            time.sleep(interval)
+            with app.app_context():
+                try:
+                    beat()
+                except Exception:
+                    traceback.print_exc()
+
+    thread = threading.Thread(target=run, name="fair-job-heartbeat", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,45 @@
+import glob
+import os
+import subprocess
+
+# ------------ AUDIO SEGMENTATION ------------ #
+
+SEGMENT_SECONDS = 10 * 60  # 10 minutes per chunk
+
+# mono 16 kHz at 32 kbps is plenty for speech and keeps a 10 minute chunk ~2.4 MB
+SPEECH_AUDIO_ARGS = ["-ac", "1", "-ar", "16000", "-c:a", "libmp3lame", "-b:a", "32k"]
+
+
+def segment_audio(
+    recording_path: str, output_dir: str, segment_seconds: int = SEGMENT_SECONDS
+) -> list[str]:
+    """
+    Split the audio track of a recording into speech-quality MP3 chunks.
+
+    ffmpeg reads the recording once, drops the video stream and writes the
+    chunks directly, so memory use does not depend on the recording length.
+
+    Args:
+        recording_path (str): Path to the source recording (e.g. an MP4)
+        output_dir (str): Directory the chunks are written into
+        segment_seconds (int): Length of each chunk in seconds
+
+    Returns:
+        list[str]: Chunk paths in playback order
+    """
+    pattern = os.path.join(output_dir, "chunk_%04d.mp3")
+    command = [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-i", recording_path,
+        "-vn", "-map", "0:a:0",
+        *SPEECH_AUDIO_ARGS,
+        "-f", "segment",
+        "-segment_time", str(segment_seconds),
+        "-reset_timestamps", "1",
+        pattern,
+    ]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to segment {recording_path}: {result.stderr.strip()}")
+
+    return sorted(glob.glob(os.path.join(output_dir, "chunk_*.mp3")))
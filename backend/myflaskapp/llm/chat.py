@@ -1,4 +1,8 @@
-from myflaskapp.llm.llm_clients import gpt4o_client
+from myflaskapp.llm.llm_clients import chat_completion
+from myflaskapp.llm.retrieval import BM25Index, format_excerpts
+
+CHAT_RETRIEVAL_TOP_K = 8
+CHAT_RETRIEVAL_MAX_TOKENS = 6000
 
 def get_chat_prompt():
     """Return the system prompt for the chat."""
@@ -10,9 +14,69 @@ def get_chat_prompt():
     always referring to the most recent version of the interview's summary. Be professional, no emojis.
     """
 
+def build_retrieval_context(messages, summary, index):
+    """
+    Build the messages for the latest chat turn from retrieved excerpts instead of the full transcript.
+
+    The excerpts change with every question, so they are returned apart from
+    the system messages that stay the same from turn to turn; fit_messages
+    places them right before the question.
+
+    Args:
+        messages (list): The stored conversation, ending with the user's question
+        summary (str): The most recent summary of the interview
+        index (list[dict]): Chunks from retrieval.build_index
+
+    Returns:
+        tuple: The chat prompt and the summary, and the excerpts most relevant to the question
+    """
+    # the previous question helps resolve follow-ups like "what did she say next?"
+    questions = [message["content"] for message in messages if message["role"] == "user"]
+    query = " ".join(questions[-2:])
+    excerpts = format_excerpts(BM25Index(index).search(query, CHAT_RETRIEVAL_TOP_K), CHAT_RETRIEVAL_MAX_TOKENS)
+
+    system_messages = [
+        {"role": "system", "content": get_chat_prompt()},
+        {"role": "system", "content": f"Most Recent Summary: {summary}"},
+    ]
+    excerpt_messages = [
+        {
+            "role": "system",
+            "content": "Excerpts from the transcript and additional context most relevant to the question "
+            f"(cite the transcript timestamps when answering):\n\n{excerpts or 'No matching excerpts.'}",
+        },
+    ]
+    return system_messages, excerpt_messages
+
+
+def compact_conversation(digest, messages):
+    """Fold older chat messages into the running digest of the conversation."""
+    conversation = "\n\n".join(f"{message['role']}: {message['content']}" for message in messages)
+    prompt = f"""
+    You are maintaining a running digest of a conversation between an investigator and an assistant about an interview.
+    Update the digest so that it also covers the new messages below. Keep every question asked, every fact, name,
+    date and [hh:mm:ss] timestamp that came up, and any instructions the investigator gave about how to answer.
+    Be concise; return only the updated digest.
+
+    Current Digest:
+    {digest or "None yet."}
+
+    New Messages:
+    {conversation}
+    """
+    response = chat_completion(
+        "utility",
+        model="gpt-4o",
+        messages=[{"role": "user", "content": prompt}],
+    )
+
+    return response.choices[0].message.content
+
+
 def stream_response(messages):
     """Stream the response from the chat model."""
-    response = gpt4o_client.chat.completions.create(
+    response = chat_completion(
+        "chat",
         model="gpt-4o",
         messages=messages,
         stream=True,
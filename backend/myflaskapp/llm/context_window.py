@@ -0,0 +1,66 @@
+import os
+from dotenv import load_dotenv
+from myflaskapp.llm.tokens import estimate_message_tokens
+
+load_dotenv()
+
+# ------------ CHAT CONTEXT WINDOW ------------ #
+
+# upper bound on the prompt sent for one chat turn
+CHAT_CONTEXT_TOKENS = int(os.getenv("CHAT_CONTEXT_TOKENS", "24000"))
+# once the turns not yet in the digest grow past this, the older ones are folded into it
+CHAT_HISTORY_TOKENS = int(os.getenv("CHAT_HISTORY_TOKENS", "6000"))
+# the most recent messages are never folded into the digest
+CHAT_KEEP_RECENT_MESSAGES = 6
+
+
+def fit_messages(
+    system_messages: list, conversation: list, digest: str = "", budget: int = CHAT_CONTEXT_TOKENS,
+    turn_messages: list = (),
+) -> list:
+    """
+    Build a prompt that stays within `budget` tokens.
+
+    The system messages and the digest of earlier turns are always kept; the
+    conversation is then filled in from the newest message backwards until the
+    budget runs out. The newest message (the question) is always included.
+
+    Args:
+        system_messages (list): Instructions and session context sent every turn
+        conversation (list): User and assistant messages not yet in the digest
+        digest (str): Compacted summary of the conversation before `conversation`
+        budget (int): Token budget for the whole prompt
+        turn_messages (list): Context for this turn only (e.g. retrieved excerpts), placed right
+            before the newest message so the prompt up to it matches the previous turn's
+
+    Returns:
+        list: Messages to send to the chat model
+    """
+    prefix = list(system_messages)
+    if digest:
+        prefix.append({"role": "system", "content": f"Summary of the earlier conversation: {digest}"})
+
+    remaining = budget - estimate_message_tokens(prefix) - estimate_message_tokens(turn_messages)
+    kept = []
+    for message in reversed(conversation):
+        cost = estimate_message_tokens([message])
+        if kept and cost > remaining:
+            break
+        kept.append(message)
+        remaining -= cost
+
+    kept.reverse()
+    return prefix + kept[:-1] + list(turn_messages) + kept[-1:]
+
+
+def messages_to_fold(conversation: list) -> int:
+    """Return how many of the oldest `conversation` messages should be folded into the digest.
+
+    Folding waits until a full batch of older messages has built up, so the
+    digest is updated every few turns rather than on every turn.
+    """
+    if len(conversation) < 2 * CHAT_KEEP_RECENT_MESSAGES:
+        return 0
+    if estimate_message_tokens(conversation) <= CHAT_HISTORY_TOKENS:
+        return 0
+    return len(conversation) - CHAT_KEEP_RECENT_MESSAGES
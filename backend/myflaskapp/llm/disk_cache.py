@@ -0,0 +1,95 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ------------ LOCAL DISK CACHE ------------ #
+
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(tempfile.gettempdir(), "fair-cache"))
+
+
+def file_sha256(path: str, block_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """
+    Content-addressed text cache stored as one file per key on local disk.
+
+    Entries older than `max_age_seconds` are treated as missing, and once the
+    namespace grows past `max_bytes` the least recently used entries are removed.
+    Reads refresh an entry's modification time, which is what LRU order uses.
+    """
+
+    def __init__(self, namespace: str, max_bytes: int, max_age_seconds: float, root: str = CACHE_DIR):
+        self.directory = os.path.join(root, namespace)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.txt")
+
+    def get(self, key: str):
+        """Return the cached text for `key`, or None if missing or expired."""
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_seconds:
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                value = f.read()
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: str, value: str):
+        """Store `value` under `key`, then evict if the cache is over budget."""
+        # write to a temp file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(value)
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def evict(self):
+        """Drop expired entries, then the least recently used until under `max_bytes`."""
+        with self._lock:
+            now = time.time()
+            entries = []
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith(".txt"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if now - stat.st_mtime > self.max_age_seconds:
+                    self._remove(entry.path)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,81 @@
+import zipfile
+from xml.etree.ElementTree import iterparse
+from myflaskapp.llm.turns import parse_teams_lines
+
+# ------------ DOCX TRANSCRIPT ------------ #
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+BODY, PARAGRAPH, RUN, HYPERLINK = f"{W}body", f"{W}p", f"{W}r", f"{W}hyperlink"
+# run children that render as characters, the same ones python-docx's paragraph.text uses
+RUN_CHARACTERS = {f"{W}tab": "\t", f"{W}ptab": "\t", f"{W}cr": "\n", f"{W}noBreakHyphen": "-"}
+
+
+class TeamsTranscript:
+    """
+    A Teams transcript read from a DOCX: its non-empty paragraphs and the speaker turns in them.
+
+    `text` is the paragraphs joined by newlines, exactly what parse_transcript
+    has always returned. `turns` is empty when the document does not follow a
+    Teams export format.
+    """
+
+    __slots__ = ("text", "preamble", "turns")
+
+    def __init__(self, text: str, preamble: str, turns: list):
+        self.text = text
+        self.preamble = preamble
+        self.turns = turns
+
+
+def iter_docx_paragraphs(docx_file: str):
+    """
+    Yield the text of each top-level paragraph of a DOCX, reading the XML incrementally.
+
+    Matches python-docx's `document.paragraphs` / `paragraph.text`: paragraphs
+    inside tables are skipped, and tabs and line breaks inside runs are kept.
+    Each paragraph is discarded once yielded, so memory stays flat for long documents.
+    """
+    with zipfile.ZipFile(docx_file) as archive, archive.open("word/document.xml") as xml:
+        parents = []
+        for event, element in iterparse(xml, events=("start", "end")):
+            if event == "start":
+                parents.append(element.tag)
+                continue
+            parents.pop()
+            if parents and parents[-1] == BODY:
+                if element.tag == PARAGRAPH:
+                    yield _paragraph_text(element)
+                element.clear()
+
+
+def _paragraph_text(paragraph) -> str:
+    parts = []
+    for child in paragraph:
+        runs = [child] if child.tag == RUN else child.iterfind(RUN) if child.tag == HYPERLINK else ()
+        for run in runs:
+            for item in run:
+                if item.tag == f"{W}t":
+                    parts.append(item.text or "")
+                elif item.tag == f"{W}br":
+                    # page and column breaks have no text
+                    if item.get(f"{W}type", "textWrapping") == "textWrapping":
+                        parts.append("\n")
+                else:
+                    parts.append(RUN_CHARACTERS.get(item.tag, ""))
+    return "".join(parts)
+
+
+def read_teams_transcript(docx_file: str) -> TeamsTranscript:
+    """Read a DOCX transcript in one streaming pass, splitting it into turns as paragraphs arrive."""
+    lines = []
+
+    def paragraphs():
+        for text in iter_docx_paragraphs(docx_file):
+            text = text.strip()
+            if text:
+                lines.append(text)
+                # a paragraph can hold line breaks, the turn parser works line by line
+                yield from text.splitlines()
+
+    preamble, turns = parse_teams_lines(paragraphs())
+    return TeamsTranscript("\n".join(lines), preamble, turns)
@@ -1,13 +1,45 @@
+import json
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from docx import Document
-from pydub import AudioSegment
-from myflaskapp.llm.llm_clients import gpt4o_client
-import PyPDF2
+from myflaskapp.llm.llm_clients import chat_completion
+from myflaskapp.llm.audio import segment_audio
+from myflaskapp.llm.disk_cache import file_sha256
+from myflaskapp.llm.turns import (
+    parse_teams_turns, parse_aligned_turns, window_turns,
+    format_teams_turn, format_aligned_turn, format_timestamp
+)
+from myflaskapp.llm.tokens import estimate_tokens, split_to_tokens, truncate_to_tokens
+from myflaskapp.llm.local_alignment import align_turns, low_confidence_regions, interview_header
+from myflaskapp.llm.docx_transcript import read_teams_transcript
+from myflaskapp.llm.pdf_context import iter_context_pages
+from myflaskapp.llm.prompts import transcript_messages
+from myflaskapp.llm.transcription import (
+    transcribe_chunks, transcribe_with_retry, transcription_cache
+)
 import re
 
 load_dotenv()
 
+# "local" aligns word by word and only asks GPT-4o about poorly matched turns, "llm" always uses GPT-4o
+ALIGNMENT_MODE = os.getenv("ALIGNMENT_MODE", "local")
+ALIGN_LOCAL_MIN_CONFIDENCE = float(os.getenv("ALIGN_LOCAL_MIN_CONFIDENCE", "0.6"))
+ALIGN_LOCAL_MAX_REGIONS = 20
+ALIGN_LOCAL_MARGIN_WORDS = 40
+ALIGN_WINDOW_SECONDS = int(os.getenv("ALIGN_WINDOW_MINUTES", "10")) * 60
+ALIGN_WINDOW_OVERLAP = 0.15  # fraction of a window's span added on each side
+ALIGN_WINDOW_MIN_MARGIN_CHARS = 500
+ALIGN_WORKERS = int(os.getenv("ALIGN_WORKERS", "4"))
+ALIGN_MAX_RETRIES = 2  # per window, see llm_clients.call_llm
+# above this estimated prompt size the summary is built section by section
+SUMMARY_MAP_REDUCE_TOKENS = int(os.getenv("SUMMARY_MAP_REDUCE_TOKENS", "60000"))
+SUMMARY_SECTION_TOKENS = int(os.getenv("SUMMARY_SECTION_TOKENS", "12000"))
+SUMMARY_CONTEXT_TOKENS = 30000
+SUMMARY_WORKERS = int(os.getenv("SUMMARY_WORKERS", "4"))
+# part of a recording's transcription cache key; bump when the way chunk transcriptions are assembled changes
+RECORDING_TRANSCRIPT_VERSION = 2
+
 # ------------ INTERVIEW SUMMARIZER FUNCTIONS ------------ #
 
 def summarize(transcript_path: str, recording_path: str):
@@ -38,21 +70,18 @@ def summarize(transcript_path: str, recording_path: str):
 
 def parse_transcript(docx_file: str) -> str:
     """Extract text from a DOCX transcript and return as a single string."""
+    return read_teams_transcript(docx_file).text
 
-    document = Document(docx_file)
-    transcript = []
-
-    for paragraph in document.paragraphs:
-        text = paragraph.text.strip()
-        if text:
-            transcript.append(text)
-              
-    transcription = "\n".join(transcript)
-
-    return transcription
-
-def parse_recording(recording_path: str) -> str:
+def parse_recording(recording_path: str, audio_hash: str = None) -> str:
     """Transcribe the audio recording using gpt-4o-transcribe and return the transcription."""
+    # a repeat upload of the same recording skips transcription entirely
+    audio_hash = audio_hash or file_sha256(recording_path)
+    recording_key = f"{audio_hash}-v{RECORDING_TRANSCRIPT_VERSION}"
+    cached = transcription_cache.get(recording_key)
+    if cached is not None:
+        print("Using cached transcription for recording.")
+        return cached
+
     # Check file size and chunk if necessary
     file_size_mb = os.path.getsize(recording_path) / (1024 * 1024)
     max_size_mb = 25
@@ -63,42 +92,152 @@ def parse_recording(recording_path: str) -> str:
             f"File size is {file_size_mb:.2f} MB, exceeding {max_size_mb} MB. Chunking audio..."
         )
 
-        audio = AudioSegment.from_file(recording_path)
-        chunk_length_ms = 10 * 60 * 1000  # 10 minutes per chunk
-        chunks = []
-        for start in range(0, len(audio), chunk_length_ms):
-            chunks.append(audio[start:start + chunk_length_ms])
-
-        for i, chunk in enumerate(chunks):
-            chunk_path = f"chunk_{i}.mp3"
-            chunk.export(chunk_path, format="mp3")
-            try:
-                with open(chunk_path, "rb") as audio_file:
-                    response = gpt4o_client.audio.transcriptions.create(
-                        model="gpt-4o-transcribe",
-                        file=audio_file,
-                        response_format="text",
-                    )
-                os.remove(chunk_path)
-                transcription += response
-            except Exception as e:
-                print(f"Error transcribing chunk {i}: {e}")
-                continue
+        # per-request scratch directory so concurrent uploads never share chunk files
+        with tempfile.TemporaryDirectory(prefix="fair-audio-") as chunk_dir:
+            chunk_paths = segment_audio(recording_path, chunk_dir)
+            # transcribe chunks concurrently, reassembled in chunk order; the space keeps the
+            # words either side of a chunk boundary apart for the word-level alignment
+            transcription = " ".join(transcribe_chunks(chunk_paths))
     else:
-        with open(recording_path, "rb") as audio_file:
-            response = gpt4o_client.audio.transcriptions.create(
-                model="gpt-4o-transcribe",
-                file=audio_file,
-                response_format="text",
-            )
-        transcription = response
+        transcription = transcribe_with_retry(recording_path)
+
+    transcription_cache.set(recording_key, transcription)
 
     return transcription
 
 
-def align_transcripts(teams_transcript: str, llm_transcript: str) -> str:
-    """Use GPT-4o to align and merge transcripts while keeping timestamps."""
-    prompt = f"""
+def align_transcripts(teams_transcript: str, llm_transcript: str, teams_turns=None) -> str:
+    """
+    Align the Teams and LLM-generated transcripts, keeping the Teams speakers and timestamps.
+
+    In "local" mode (the default) the transcripts are aligned word by word on
+    this machine and GPT-4o only re-aligns the turns that matched poorly.
+    Otherwise, or when the Teams transcript has no recognizable turns, the
+    whole alignment is done by GPT-4o in windows.
+
+    `teams_turns` is the (preamble, turns) pair when the transcript was already
+    split into turns while it was read, see docx_transcript.read_teams_transcript.
+    """
+    preamble, turns = teams_turns or parse_teams_turns(teams_transcript)
+    if ALIGNMENT_MODE == "local" and turns:
+        return align_transcripts_locally(preamble, turns, llm_transcript)
+    return align_transcripts_windowed(teams_transcript, llm_transcript, (preamble, turns))
+
+
+def align_transcripts_locally(preamble: str, turns: list, llm_transcript: str) -> str:
+    """Align turns locally and fall back to GPT-4o only for low-confidence regions."""
+    llm_words, aligned = align_turns(turns, llm_transcript)
+    regions = low_confidence_regions(aligned, ALIGN_LOCAL_MIN_CONFIDENCE)
+    aligned_turns = [turn.turn for turn in aligned]
+
+    if regions:
+        low_count = sum(end - start for start, end in regions)
+        print(f"Aligned {len(turns) - low_count}/{len(turns)} turns locally, sending {len(regions)} regions to GPT-4o...")
+
+    if len(regions) > ALIGN_LOCAL_MAX_REGIONS or sum(end - start for start, end in regions) > len(turns) / 2:
+        # mostly unmatched, the windowed alignment is the better tool
+        teams_transcript = "\n\n".join([preamble] + [format_teams_turn(turn) for turn in turns])
+        return align_transcripts_windowed(teams_transcript, llm_transcript)
+
+    def align_region(region):
+        start, end = region
+        # the LLM words between the neighbouring well-aligned turns, plus a margin
+        first = aligned[start - 1].words[1] if start > 0 else 0
+        last = aligned[end].words[0] if end < len(aligned) else len(llm_words)
+        first = max(0, first - ALIGN_LOCAL_MARGIN_WORDS)
+        last = min(len(llm_words), last + ALIGN_LOCAL_MARGIN_WORDS)
+        part = """
+    This is an excerpt from the middle of the interview. Do not include the Interviewee, Interview Date or Duration lines; output only the speaker turns of this excerpt.
+    The LLM-generated transcript above may start or end mid-sentence and include words from the neighbouring turns. Only use the portion that matches the Teams turns in this excerpt.
+    """
+        teams_excerpt = "\n\n".join(format_teams_turn(turn) for turn in turns[start:end])
+        content = align_window(teams_excerpt, " ".join(llm_words[first:last]), part)
+        _, region_turns = parse_aligned_turns(content)
+        # keep the local result if the response cannot be parsed back into turns
+        return region_turns or aligned_turns[start:end]
+
+    if regions:
+        with ThreadPoolExecutor(max_workers=min(ALIGN_WORKERS, len(regions))) as executor:
+            replacements = list(executor.map(align_region, regions))
+        # splice from the back so earlier indexes stay valid
+        for (start, end), region_turns in reversed(list(zip(regions, replacements))):
+            aligned_turns[start:end] = region_turns
+
+    return "\n\n".join(
+        [interview_header(preamble)] + [format_aligned_turn(turn) for turn in aligned_turns]
+    )
+
+
+def align_transcripts_windowed(teams_transcript: str, llm_transcript: str, teams_turns=None) -> str:
+    """
+    Align the transcripts in timestamp-bounded windows that are sent to GPT-4o concurrently.
+
+    Each window of Teams turns is paired with the proportional span of the
+    LLM-generated transcript (plus some overlap), and the aligned windows are
+    stitched back together in order. Transcripts without recognizable Teams
+    turns are aligned in a single call.
+    """
+    preamble, turns = teams_turns or parse_teams_turns(teams_transcript)
+    windows = window_turns(turns, ALIGN_WINDOW_SECONDS)
+    if len(windows) <= 1:
+        return align_window(teams_transcript, llm_transcript)
+
+    print(f"Aligning transcript in {len(windows)} windows...")
+
+    # map each window onto the LLM transcript by its share of the Teams text
+    window_texts = ["\n\n".join(format_teams_turn(turn) for turn in window) for window in windows]
+    window_texts[0] = f"{preamble}\n\n{window_texts[0]}" if preamble else window_texts[0]
+    total_chars = sum(len(text) for text in window_texts)
+    llm_spans = []
+    offset = 0
+    for text in window_texts:
+        start = offset / total_chars * len(llm_transcript)
+        offset += len(text)
+        end = offset / total_chars * len(llm_transcript)
+        margin = max(ALIGN_WINDOW_MIN_MARGIN_CHARS, (end - start) * ALIGN_WINDOW_OVERLAP)
+        llm_spans.append(_word_span(llm_transcript, start - margin, end + margin))
+
+    def align_part(i):
+        if i == 0:
+            part = f"""
+    This is part 1 of {len(windows)} of the interview. Include the Interviewee, Interview Date and Duration lines, then the speaker turns in this part only.
+    """
+        else:
+            part = f"""
+    This is part {i + 1} of {len(windows)} of the interview. Do not include the Interviewee, Interview Date or Duration lines; start directly with the first speaker turn of this part.
+    """
+        part += """
+    The LLM-generated transcript above is an excerpt that may start or end mid-sentence and overlap the neighbouring parts. Only use the portion that matches the Teams turns in this part.
+    """
+        return align_window(window_texts[i], llm_spans[i], part)
+
+    with ThreadPoolExecutor(max_workers=min(ALIGN_WORKERS, len(windows))) as executor:
+        aligned_windows = list(executor.map(align_part, range(len(windows))))
+
+    return "\n\n".join(window.strip() for window in aligned_windows)
+
+
+def _word_span(text: str, start: float, end: float) -> str:
+    """Return text[start:end] widened to whole words and clamped to the text."""
+    start, end = max(0, int(start)), min(len(text), int(end))
+    while start > 0 and not text[start - 1].isspace():
+        start -= 1
+    while end < len(text) and not text[end].isspace():
+        end += 1
+    return text[start:end].strip()
+
+
+def align_window(teams_transcript: str, llm_transcript: str, part: str = "") -> str:
+    """
+    Use GPT-4o to align and merge transcripts while keeping timestamps.
+
+    The instructions go first and are the same for every call, so the windows
+    and regions of a transcript share a cached prefix; the transcripts and the
+    `part` notes about this window follow them. Alignments bypass the response
+    cache: re-running a summarize after a poor alignment must get a fresh one,
+    and the transcripts would crowd everything else out of the memory tier.
+    """
+    instructions = """
     You are a helpful assistant tasked with refining an interview transcript by using two versions of the same interview:
 
     1. The Teams Transcript, which contains accurate timestamps and should serve as the primary source for both structure and content.
@@ -133,21 +272,25 @@ def align_transcripts(teams_transcript: str, llm_transcript: str) -> str:
     - Leave a blank line between each speaker's turn.
 
     Use the Teams transcript as the authoritative source and the LLM-generated transcript only to correct or complete it. Do not merge or paraphrase across both transcripts in a way that loses the structure of the Teams version.
-
     Return only the final formatted transcript, with no leading or trailing explanation.
-
+    """
+    transcripts = f"""
     Teams Transcript:
     {teams_transcript}
 
     LLM-generated Transcript:
     {llm_transcript}
-    """
+    {part}"""
 
     # Call the GPT-4 model to align and merge the transcripts
-    response = gpt4o_client.chat.completions.create(
+    response = chat_completion(
+        "align", max_retries=ALIGN_MAX_RETRIES, cache=False,
         model="gpt-4o",
         max_tokens=16384,
-        messages=[{"role": "user", "content": prompt}],
+        messages=[
+            {"role": "system", "content": instructions},
+            {"role": "user", "content": transcripts},
+        ],
     )
 
     content = response.choices[0].message.content
@@ -155,8 +298,7 @@ def align_transcripts(teams_transcript: str, llm_transcript: str) -> str:
     return content
 
 
-def generate_summary(aligned_transcript: str, additional_context: str = ""):
-    prompt = f"""
+SUMMARY_GUIDELINES = """
     You are an AI assistant helping to summarize interview transcripts for a civil rights investigation.
 
     Your task is to generate a comprehensive, detailed, and structured third-person narrative summary of the transcript below, following these guidelines:
@@ -180,16 +322,136 @@ def generate_summary(aligned_transcript: str, additional_context: str = ""):
     - Organize the summary into **short, informative paragraphs** or clear sections to improve readability.
     - Ensure the summary is comprehensive, leaving no significant detail or event unmentioned.
     - Only generate the summary; avoid any unnecessary leading or trailing sentences.
+"""
 
-    Transcript:
-    {aligned_transcript}
-    
-    Additional Context:
-    {additional_context if additional_context != "" else "None provided."}
+
+def generate_summary(aligned_transcript: str, additional_context: str = ""):
     """
+    Stream the interview summary.
+
+    Transcripts and context too large for one comfortable prompt are
+    summarized section by section first (see generate_summary_map_reduce).
+    """
+    if estimate_tokens(aligned_transcript) + estimate_tokens(additional_context) > SUMMARY_MAP_REDUCE_TOKENS:
+        yield from generate_summary_map_reduce(aligned_transcript, additional_context)
+    else:
+        yield from _stream_summary(aligned_transcript, additional_context)
+
+
+def _stream_summary(aligned_transcript: str, additional_context: str):
+    # the guidelines govern the call; the transcript and context messages are the session's own
+    messages = [{"role": "system", "content": SUMMARY_GUIDELINES}] + transcript_messages(
+        aligned_transcript, additional_context
+    )
 
     # Call the GPT-4 model to generate the summary in a streaming manner
-    response = gpt4o_client.chat.completions.create(
+    response = chat_completion(
+        "summary",
+        model="gpt-4o",
+        messages=messages,
+        stream=True,  # Enable streaming
+    )
+
+    for chunk in response:
+        if not chunk or not hasattr(chunk, "choices") or len(chunk.choices) == 0:
+            continue  # skip invalid or empty chunks
+
+        delta = getattr(chunk.choices[0].delta, "content", "") or ""
+        yield delta
+
+
+def generate_summary_map_reduce(aligned_transcript: str, additional_context: str = ""):
+    """
+    Summarize a long transcript in timestamp-bounded sections, then stream a final reduce pass.
+
+    The sections are condensed into cited notes concurrently, and the notes are
+    merged into the usual heading-1/heading-2 summary by a single streaming call.
+    A transcript with no parseable speaker turns is split by token count instead.
+    """
+    header, turns = parse_aligned_turns(aligned_transcript)
+    # (start seconds of the section or None, section text)
+    sections = []
+    if turns:
+        section_turns = []
+        section_tokens = 0
+        for turn in turns:
+            turn_tokens = estimate_tokens(turn.text)
+            if not section_turns or section_tokens + turn_tokens > SUMMARY_SECTION_TOKENS:
+                section_turns.append([])
+                section_tokens = 0
+            section_turns[-1].append(turn)
+            section_tokens += turn_tokens
+        sections = [
+            (group[0].start, "\n\n".join(format_aligned_turn(turn) for turn in group)) for group in section_turns
+        ]
+    else:
+        # every line ended up in the header; there are no turns to bound the sections by
+        header = ""
+        sections = [(None, text) for text in split_to_tokens(aligned_transcript, SUMMARY_SECTION_TOKENS)]
+
+    if len(sections) <= 1:
+        # the transcript itself fits, it is the additional context that is too large
+        yield from _stream_summary(
+            aligned_transcript, truncate_to_tokens(additional_context, SUMMARY_CONTEXT_TOKENS)
+        )
+        return
+
+    print(f"Summarizing transcript in {len(sections)} sections...")
+
+    # fixed instructions and interview details first, so the section calls share a prefix
+    instructions = f"""
+    You are an AI assistant helping to summarize interview transcripts for a civil rights investigation.
+
+    You will be given one section of a long interview transcript.
+    Write detailed notes on everything that transpired in that section so that a full summary of the interview can later be written from the notes alone:
+
+    - Capture every fact, event, name, date, place and allegation mentioned, in the order they come up.
+    - Cite the timestamp of each detail in brackets like [hh:mm:ss], copied exactly from the speaker turn it came from. Never invent timestamps.
+    - Do not mention the investigator or interviewer, and avoid attribution such as "the interviewee said".
+    - Use short bullet points; do not add a title, headings, or any leading or trailing sentences.
+
+    Interview Details:
+    {header or "Not available."}
+    """
+
+    def summarize_section(i):
+        start, text = sections[i]
+        starting_at = f", starting at [{format_timestamp(start)}]" if start is not None else ""
+        response = chat_completion(
+            "summary",
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": instructions},
+                {
+                    "role": "user",
+                    "content": f"Section {i + 1} of {len(sections)}{starting_at}:\n\n{text}",
+                },
+            ],
+        )
+        return response.choices[0].message.content
+
+    with ThreadPoolExecutor(max_workers=min(SUMMARY_WORKERS, len(sections))) as executor:
+        notes = list(executor.map(summarize_section, range(len(sections))))
+
+    section_notes = "\n\n".join(
+        f"Section {i + 1}:\n{note.strip()}" for i, note in enumerate(notes)
+    )
+    prompt = f"""{SUMMARY_GUIDELINES}
+    The transcript is too long to include in full, so it has been condensed into the section notes below, in chronological order.
+    Write the summary from these notes and cite the [hh:mm:ss] timestamps exactly as they appear in the notes.
+
+    Interview Details:
+    {header or "Not available."}
+
+    Section Notes:
+    {section_notes}
+
+    Additional Context:
+    {truncate_to_tokens(additional_context, SUMMARY_CONTEXT_TOKENS) if additional_context != "" else "None provided."}
+    """
+
+    response = chat_completion(
+        "summary",
         model="gpt-4o",
         messages=[{"role": "system", "content": prompt}],
         stream=True,  # Enable streaming
@@ -213,7 +475,8 @@ def initial_greeting():
     """
 
     # Call the GPT-4 model to generate the greeting
-    response = gpt4o_client.chat.completions.create(
+    response = chat_completion(
+        "utility", priority="batch",
         model="gpt-4o",
         messages=[{"role": "user", "content": prompt}],
     )
@@ -225,7 +488,8 @@ def initial_greeting():
 
 def generate_revision(messages: list):
     # Call the GPT-4 model to generate the revised summary
-    response = gpt4o_client.chat.completions.create(
+    response = chat_completion(
+        "revision",
         model="gpt-4o",
         messages=messages,
         stream=True,  # Enable streaming
@@ -239,45 +503,105 @@ def generate_revision(messages: list):
         yield delta
 
 
-def parse_additional_context(pdf_filepaths: list[str]) -> str:
+def plan_revision(preamble: str, headings: list[str], request: str):
     """
-    Extract text from a list of PDF files and concatenate the content into a single string.
-    
-    Args:
-        pdf_filepaths (list[str]): List of paths to PDF files
-        
+    Work out which heading-2 sections of a summary a revision request touches.
+
     Returns:
-        str: Concatenated text content from all PDFs
+        dict | None: {"sections": [indexes to rewrite], "insert_after": index
+        after which a new section is added, or None}, or None when the request
+        has to be applied to the whole summary (tone, length, title, ordering, ...)
+    """
+    outline = "\n".join(f"{i}: {heading}" for i, heading in enumerate(headings))
+    prompt = f"""
+    You are routing a revision request for an interview summary to the sections it affects.
+
+    Summary title and introduction:
+    {preamble}
+
+    Sections (index: heading):
+    {outline}
+
+    Revision request:
+    {request}
+
+    Respond with a JSON object with these keys:
+    - "scope": "sections" if the request can be applied by rewriting only some sections and/or adding one new section, or "whole" if it changes the whole summary (overall tone, length, title, introduction, ordering or merging of sections).
+    - "sections": the indexes of the sections that must be rewritten (empty if none).
+    - "insert_after": if a new section must be added, the index of the section it goes after (-1 for before the first section), otherwise null.
     """
-    all_content = []
-    
-    for filepath in pdf_filepaths:
-        if not filepath.lower().endswith('.pdf'):
-            print(f"Warning: {filepath} is not a PDF file. Skipping.")
-            continue
-            
-        try:
-            content = []
-            with open(filepath, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                # Add filename as a header for context
-                filename = os.path.basename(filepath)
-                content.append(f"Content from {filename}:")
-                
-                # Extract text from each page
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text = page.extract_text()
-                    if text:
-                        content.append(f"[Page {page_num + 1}] {text}")
-            
-            all_content.append("\n".join(content))
-            
-        except Exception as e:
-            print(f"Error processing {filepath}: {str(e)}")
-            
-    # Combine all content with clear separators
-    combined_content = "\n\n" + "-" * 40 + "\n\n".join(all_content)
-    
-    return combined_content
\ No newline at end of file
+    response = chat_completion(
+        "utility",
+        model="gpt-4o",
+        messages=[{"role": "user", "content": prompt}],
+        response_format={"type": "json_object"},
+    )
+
+    try:
+        plan = json.loads(response.choices[0].message.content)
+    except (TypeError, ValueError):
+        return None
+
+    if plan.get("scope") != "sections":
+        return None
+    sections = sorted({i for i in plan.get("sections") or [] if isinstance(i, int) and 0 <= i < len(headings)})
+    insert_after = plan.get("insert_after")
+    if not isinstance(insert_after, int) or not -1 <= insert_after < len(headings):
+        insert_after = None
+    if not sections and insert_after is None:
+        return None
+    return {"sections": sections, "insert_after": insert_after}
+
+
+def revise_section(context_messages: list, summary: str, section: str, request: str, excerpts: str = "") -> str:
+    """
+    Rewrite one heading-2 section of the summary according to the revision request.
+
+    Pass an empty `section` to write a new section instead. `excerpts` are
+    transcript passages relevant to the section, for sessions whose context
+    messages do not carry the whole transcript. Returns the section's markdown,
+    starting with its "## " heading.
+    """
+    if section:
+        task = f"""Rewrite only the section below so that it implements the revision request. Keep its "## " heading unless the request asks to rename it.
+
+                Section to Revise:
+                {section}"""
+    else:
+        task = """Write the new section the revision request asks for, starting with a "## " heading."""
+
+    # fixed instructions and the summary come before what differs between the section calls
+    messages = context_messages + [
+        {
+            "role": "system",
+            "content": """Your task is to revise one section of an interview summary based on the user's request.
+
+                Guidelines for revision:
+                - CRITICAL: Preserve all timestamp citations (e.g., [00:15:30]) regardless of revision requests - these references are essential for locating information in the original interview
+                - If adding new content from the transcript, always include the corresponding timestamp, DO NOT HALLUCINATE TIMES
+                - Match the tone, style and formatting of the rest of the summary
+                - Do not repeat content that belongs to other sections of the summary
+
+                Provide only the section markdown, with no leading text, explanatory notes, or metadata.
+                """,
+        },
+        {"role": "system", "content": f"Most Recent Summary: {summary}"},
+    ]
+    if excerpts:
+        messages.append({"role": "system", "content": f"Relevant Transcript and Context Excerpts:\n\n{excerpts}"})
+    messages += [
+        {"role": "system", "content": task},
+        {"role": "user", "content": f"Can you make these revisions to the summary: {request}"},
+    ]
+    response = chat_completion(
+        "revision",
+        model="gpt-4o",
+        messages=messages,
+    )
+
+    return response.choices[0].message.content
+
+
+def parse_context_pages(pdf_filepaths: list[str], file_hashes: list[str] = None) -> list:
+    """Extract the non-empty pages of a list of PDF files as pdf_context.ContextPage."""
+    return list(iter_context_pages(pdf_filepaths, file_hashes))
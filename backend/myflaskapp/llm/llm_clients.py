@@ -1,7 +1,22 @@
 import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+import openai
 from openai import AzureOpenAI
-from openai import OpenAI
+from openai import OpenAI, DefaultHttpxClient, Timeout
 from dotenv import load_dotenv
+try:
+    # connection limits of the HTTP library the SDK is built on: httpx2 from openai 3, httpx before
+    from httpx2 import Limits
+except ImportError:
+    from httpx import Limits
+from myflaskapp.llm.scheduler import scheduler
+from myflaskapp.llm.response_cache import (
+    LLM_CACHE_ENABLED, cache_key, completion_from_cache, record_stream, replay_stream, response_cache,
+)
+from myflaskapp.llm.tokens import estimate_message_tokens
 
 load_dotenv()
 
@@ -13,8 +28,294 @@ if not openai_gpt4o_api_key:
         "Missing required environment variables: OPENAI_GPT4O_API_KEY"
     )
 
+# point at a local fake server in development and tests, e.g. http://localhost:8001/v1
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+# connections kept open per process; every worker thread shares them
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "20"))
+
 gpt4o_client = OpenAI(
-    api_key=openai_gpt4o_api_key
+    api_key=openai_gpt4o_api_key,
+    base_url=OPENAI_BASE_URL,
+    # retries are handled by call_llm, which also knows about the circuit breaker
+    max_retries=0,
+    http_client=DefaultHttpxClient(
+        limits=Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE,
+            keepalive_expiry=60,
+        ),
+    ),
 )
 
-__all__ = ["gpt4o_client"]
\ No newline at end of file
+# ------------ CALL POLICY ------------ #
+
+# per-operation timeouts; for streams `read` is the longest gap allowed between chunks
+OPERATION_TIMEOUTS = {
+    "chat": Timeout(60, connect=5),
+    "summary": Timeout(300, connect=5),
+    "revision": Timeout(300, connect=5),
+    "align": Timeout(600, connect=5),
+    "transcribe": Timeout(600, connect=10),
+    "utility": Timeout(60, connect=5),
+}
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_SECONDS = float(os.getenv("LLM_BACKOFF_SECONDS", "1"))
+LLM_MAX_BACKOFF_SECONDS = float(os.getenv("LLM_MAX_BACKOFF_SECONDS", "60"))
+# consecutive upstream failures that open the breaker, and how long it stays open
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+# scheduler class of each operation unless the caller says otherwise, see scheduler.py
+OPERATION_PRIORITIES = {
+    "chat": "interactive",
+    "revision": "revision",
+    "utility": "revision",
+    "summary": "batch",
+    "align": "batch",
+    "transcribe": "batch",
+}
+# completion tokens assumed for the token budget when a call sets no max_tokens
+DEFAULT_COMPLETION_TOKENS = 1000
+
+# errors worth retrying; anything else (bad request, auth, ...) fails straight away
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the API while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Stops calling the API for a while after repeated upstream failures.
+
+    After `failures` consecutive timeouts, connection errors or 5xx responses
+    the breaker opens and calls fail immediately for `reset_seconds`. Then one
+    trial call is let through: success closes the breaker, failure re-opens it.
+    Rate limits do not count, they are handled by backing off.
+    """
+
+    def __init__(self, failures: int, reset_seconds: float):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self._consecutive = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._trial_running:
+                raise CircuitOpenError("OpenAI API unavailable, not calling it for now")
+            self._trial_running = True
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive += 1
+            if self._trial_running or self._consecutive >= self.failures:
+                print(f"OpenAI circuit breaker open for {self.reset_seconds:.0f}s")
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+    def release_trial(self):
+        """Let the next call be the trial when this one failed for a reason unrelated to the API's health."""
+        with self._lock:
+            self._trial_running = False
+
+
+breaker = CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_RESET_SECONDS)
+
+
+class PromptCacheStats:
+    """Prompt tokens, and how many of them the API served from its prompt cache, per operation."""
+
+    def __init__(self):
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, usage):
+        if usage is None:
+            return
+        prompt_tokens = usage.prompt_tokens or 0
+        cached_tokens = getattr(usage.prompt_tokens_details, "cached_tokens", None) or 0
+        print(f"OpenAI {operation} call: {prompt_tokens} prompt tokens, {cached_tokens} cached")
+        with self._lock:
+            totals = self._totals.setdefault(operation, {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0})
+            totals["calls"] += 1
+            totals["prompt_tokens"] += prompt_tokens
+            totals["cached_tokens"] += cached_tokens
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                operation: {
+                    **totals,
+                    "cached_ratio": round(totals["cached_tokens"] / totals["prompt_tokens"], 3)
+                    if totals["prompt_tokens"] else 0,
+                }
+                for operation, totals in self._totals.items()
+            }
+
+
+prompt_cache_stats = PromptCacheStats()
+
+
+def retry_after_seconds(error):
+    """The delay the API asked for in Retry-After / retry-after-ms, if any."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            value = headers["retry-after"]
+            try:
+                return float(value)
+            except ValueError:
+                return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+def call_llm(
+    operation: str, fn, max_retries: int = LLM_MAX_RETRIES, priority: str = None, tokens: int = 0,
+    stream: bool = False,
+):
+    """
+    Run `fn(client)` against the shared client with the operation's timeout and retry policy.
+
+    Each attempt first waits for the scheduler to admit it under `priority`
+    (the operation's class by default), counting `tokens` against the token
+    budget. The slot is held until the call returns, or for streams until the
+    stream has been read to the end. The circuit breaker is only consulted
+    once the call has been admitted, so a call still queued in the scheduler
+    never holds the breaker's half-open trial.
+
+    Retryable errors are retried with jittered exponential backoff, waiting at
+    least as long as a Retry-After header asks. Streams are retried only while
+    being opened; once chunks are flowing, errors reach the caller.
+
+    Raises:
+        CircuitOpenError: If the API has been failing and the breaker is open
+    """
+    client = gpt4o_client.with_options(timeout=OPERATION_TIMEOUTS[operation])
+    priority = priority or OPERATION_PRIORITIES[operation]
+    attempt = 0
+    while True:
+        scheduler.acquire(priority, tokens)
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            scheduler.release(priority)
+            raise
+        try:
+            result = fn(client)
+        except RETRYABLE_ERRORS as e:
+            scheduler.release(priority)
+            if isinstance(e, openai.RateLimitError):
+                breaker.release_trial()
+            else:
+                breaker.record_failure()
+            if attempt >= max_retries:
+                raise
+            delay = LLM_BACKOFF_SECONDS * (2 ** attempt) * (0.5 + random.random())
+            requested = retry_after_seconds(e)
+            if requested is not None:
+                delay = max(delay, requested)
+            delay = min(delay, LLM_MAX_BACKOFF_SECONDS)
+            print(f"OpenAI {operation} call failed ({type(e).__name__}), retrying in {delay:.1f}s...")
+            time.sleep(delay)
+            attempt += 1
+            continue
+        except openai.APIStatusError:
+            scheduler.release(priority)
+            # the API answered, the request itself was rejected
+            breaker.record_success()
+            raise
+        except BaseException:
+            scheduler.release(priority)
+            breaker.release_trial()
+            raise
+        breaker.record_success()
+        if stream:
+            return _release_when_done(result, priority)
+        scheduler.release(priority)
+        return result
+
+
+def _release_when_done(stream, priority: str):
+    """Pass a stream's chunks through, freeing its scheduler slot once it is finished or closed."""
+    try:
+        yield from stream
+    finally:
+        # give the connection back to the pool if the reader stopped early
+        stream.close()
+        scheduler.release(priority)
+
+
+def _record_usage(operation: str, stream):
+    """Pass a stream's chunks through, recording the usage the API sends in its last chunk."""
+    try:
+        for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                prompt_cache_stats.record(operation, chunk.usage)
+            yield chunk
+    finally:
+        stream.close()
+
+
+def chat_completion(
+    operation: str, max_retries: int = LLM_MAX_RETRIES, priority: str = None, cache: bool = True, **kwargs
+):
+    """
+    chat.completions.create through call_llm; with stream=True the stream is returned once open.
+
+    Identical requests are answered from the response cache without calling
+    the API, cached streams being replayed as streams. Pass cache=False for
+    calls that must reach the model every time.
+    """
+    stream = kwargs.get("stream", False)
+    key = None
+    if cache and LLM_CACHE_ENABLED:
+        key = cache_key(kwargs)
+        cached = response_cache.get(key)
+        if cached is not None:
+            return replay_stream(key, cached) if stream else completion_from_cache(key, cached)
+
+    if stream:
+        # the last chunk then carries the usage, with no choices, which every reader already skips
+        kwargs.setdefault("stream_options", {"include_usage": True})
+    tokens = estimate_message_tokens(kwargs["messages"]) + kwargs.get("max_tokens", DEFAULT_COMPLETION_TOKENS)
+    response = call_llm(
+        operation, lambda client: client.chat.completions.create(**kwargs), max_retries,
+        priority=priority, tokens=tokens, stream=stream,
+    )
+    if stream:
+        response = _record_usage(operation, response)
+        return record_stream(key, response) if key else response
+    prompt_cache_stats.record(operation, response.usage)
+    if key is None:
+        return response
+    choice = response.choices[0]
+    response_cache.set(key, response.model, choice.message.content, choice.finish_reason)
+    return response
+
+
+__all__ = ["gpt4o_client", "call_llm", "chat_completion", "CircuitOpenError", "prompt_cache_stats"]
@@ -0,0 +1,173 @@
+import re
+from bisect import bisect_left, bisect_right
+from collections import Counter, namedtuple
+from difflib import SequenceMatcher
+
+from myflaskapp.llm.turns import Turn
+
+# ------------ LOCAL TRANSCRIPT ALIGNMENT ------------ #
+
+# a Teams turn with its words swapped for the matching span of the LLM transcript;
+# `words` is the [start, end) word range of that span and `confidence` the share
+# of the turn's Teams words that were matched inside it
+AlignedTurn = namedtuple("AlignedTurn", ["turn", "words", "confidence"])
+
+ANCHOR_NGRAM = 3
+MIN_SPAN_RATIO = 0.5  # aligned spans far shorter or longer than the Teams turn are suspect
+MAX_SPAN_RATIO = 2.0
+
+MONTHS = "January|February|March|April|May|June|July|August|September|October|November|December"
+DATE_PATTERN = re.compile(
+    rf"\b(?:(?:{MONTHS})\s+\d{{1,2}},?\s+\d{{4}}|\d{{1,2}}/\d{{1,2}}/\d{{2,4}}|\d{{4}}-\d{{2}}-\d{{2}})\b"
+)
+DURATION_PATTERN = re.compile(r"^(?:\d+h)?\s*(?:\d+m)?\s*(?:\d+s)?$")
+TITLE_NAME_PATTERN = re.compile(r"(?i:interview (?:with|of))\s+([A-Z][\w.'-]*(?:\s+[A-Z][\w.'-]*)*)")
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w]", "", word.lower())
+
+
+def _anchors(teams_keys: list, llm_keys: list) -> list:
+    """Return (teams_index, llm_index) pairs for n-grams that occur exactly once in
+    both transcripts, thinned to the longest run that is increasing in both."""
+    def unique_ngrams(keys):
+        grams = [tuple(keys[i:i + ANCHOR_NGRAM]) for i in range(len(keys) - ANCHOR_NGRAM + 1)]
+        counts = Counter(grams)
+        return {gram: i for i, gram in enumerate(grams) if counts[gram] == 1 and all(gram)}
+
+    teams_grams = unique_ngrams(teams_keys)
+    llm_grams = unique_ngrams(llm_keys)
+    pairs = sorted((i, llm_grams[gram]) for gram, i in teams_grams.items() if gram in llm_grams)
+
+    # longest increasing subsequence on the LLM positions (patience sorting)
+    tails, tail_pairs, previous = [], [], [None] * len(pairs)
+    for k, (_, j) in enumerate(pairs):
+        pos = bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_pairs.append(k)
+        else:
+            tails[pos] = j
+            tail_pairs[pos] = k
+        previous[k] = tail_pairs[pos - 1] if pos else None
+
+    chain = []
+    k = tail_pairs[-1] if tail_pairs else None
+    while k is not None:
+        chain.append(pairs[k])
+        k = previous[k]
+    return chain[::-1]
+
+
+def _match_words(teams_keys: list, llm_keys: list) -> dict:
+    """Map Teams word indexes to LLM word indexes for every word matched between anchors."""
+    anchors = _anchors(teams_keys, llm_keys)
+    bounds = [(0, 0)] + [
+        (i, j) for i, j in anchors
+    ] + [(len(teams_keys), len(llm_keys))]
+
+    matches = {}
+    for (t0, l0), (t1, l1) in zip(bounds, bounds[1:]):
+        if t1 <= t0 or l1 <= l0:
+            continue
+        matcher = SequenceMatcher(None, teams_keys[t0:t1], llm_keys[l0:l1], autojunk=False)
+        for a, b, size in matcher.get_matching_blocks():
+            for offset in range(size):
+                matches[t0 + a + offset] = l0 + b + offset
+    return matches
+
+
+def align_turns(turns: list, llm_transcript: str):
+    """
+    Align Teams turns against the LLM transcript word by word.
+
+    Unique n-grams shared by both transcripts anchor the alignment, the gaps
+    between anchors are matched with difflib, and each turn then takes the LLM
+    words from its first matched word up to where the next turn starts.
+
+    Args:
+        turns (list[Turn]): Teams turns from parse_teams_turns
+        llm_transcript (str): The gpt-4o-transcribe text
+
+    Returns:
+        tuple[list[str], list[AlignedTurn]]: The LLM transcript's words and one
+        aligned turn per Teams turn, in order
+    """
+    llm_words = llm_transcript.split()
+    llm_keys = [_normalize(word) for word in llm_words]
+
+    teams_keys, turn_starts = [], []
+    for turn in turns:
+        turn_starts.append(len(teams_keys))
+        teams_keys.extend(_normalize(word) for word in turn.text.split())
+    turn_starts.append(len(teams_keys))
+
+    matches = _match_words(teams_keys, llm_keys)
+    matched = sorted(matches)
+
+    # the LLM word each turn starts at, shifted back over unmatched leading words
+    boundaries = []
+    for k in range(len(turns)):
+        first = bisect_left(matched, turn_starts[k])
+        if first < len(matched) and matched[first] < turn_starts[k + 1]:
+            t = matched[first]
+            start = max(0, matches[t] - (t - turn_starts[k]))
+        elif boundaries:
+            start = boundaries[-1]
+        else:
+            start = 0
+        boundaries.append(max(start, boundaries[-1]) if boundaries else start)
+    boundaries.append(len(llm_words))
+    # nothing before the first matched turn is dropped
+    boundaries[0] = 0
+
+    aligned = []
+    for k, turn in enumerate(turns):
+        start, end = boundaries[k], max(boundaries[k], boundaries[k + 1])
+        teams_count = turn_starts[k + 1] - turn_starts[k]
+        hits = bisect_right(matched, turn_starts[k + 1] - 1) - bisect_left(matched, turn_starts[k])
+        confidence = hits / teams_count if teams_count else 0.0
+        ratio = (end - start) / teams_count if teams_count else 0.0
+        if not MIN_SPAN_RATIO <= ratio <= MAX_SPAN_RATIO:
+            confidence = min(confidence, ratio, 1 / ratio if ratio else 0.0)
+        text = " ".join(llm_words[start:end]) or turn.text
+        aligned.append(AlignedTurn(Turn(turn.speaker, turn.start, text), (start, end), confidence))
+
+    return llm_words, aligned
+
+
+def low_confidence_regions(aligned: list, min_confidence: float) -> list:
+    """Group consecutive turns under `min_confidence` into [start, end) turn ranges."""
+    regions = []
+    for k, turn in enumerate(aligned):
+        if turn.confidence >= min_confidence:
+            continue
+        if regions and regions[-1][1] == k:
+            regions[-1][1] = k + 1
+        else:
+            regions.append([k, k + 1])
+    return [tuple(region) for region in regions]
+
+
+def interview_header(preamble: str) -> str:
+    """Build the Interviewee / Interview Date / Duration header from the Teams preamble.
+
+    The interviewee is taken from an "Interview with ..." title; like the date and
+    duration it is "N/A" when the preamble does not state it, never guessed.
+    """
+    interviewee = date = duration = "N/A"
+    for line in preamble.splitlines():
+        if date == "N/A" and DATE_PATTERN.search(line):
+            date = DATE_PATTERN.search(line).group(0)
+        elif duration == "N/A" and line.strip() and DURATION_PATTERN.match(line.strip()):
+            duration = line.strip()
+        name = TITLE_NAME_PATTERN.search(line)
+        if interviewee == "N/A" and name:
+            interviewee = name.group(1)
+
+    return (
+        f"**Interviewee: {interviewee}**\n"
+        f"**Interview Date: {date}**\n"
+        f"**Duration: {duration}**"
+    )
@@ -0,0 +1,122 @@
+import json
+import multiprocessing
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from dotenv import load_dotenv
+import PyPDF2
+from myflaskapp.llm.disk_cache import DiskCache, file_sha256
+
+load_dotenv()
+
+# ------------ PDF CONTEXT EXTRACTION ------------ #
+
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 2)))
+# pages extracted per worker task; large PDFs are split into several tasks
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+
+# extracted page texts keyed by the PDF's SHA-256, so an exhibit attached to
+# several interviews is only parsed once
+pdf_cache = DiskCache(
+    "pdf_pages",
+    max_bytes=int(os.getenv("PDF_CACHE_MAX_MB", "256")) * 1024 * 1024,
+    max_age_seconds=float(os.getenv("PDF_CACHE_MAX_AGE_DAYS", "30")) * 24 * 60 * 60,
+)
+
+# one page of additional context; `page` is 1-based
+ContextPage = namedtuple("ContextPage", ["filename", "page", "text"])
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Create the worker pool on first use.
+
+    Workers are spawned rather than forked, since forking a process that is
+    already running request and job threads can copy held locks into the child.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _extract_pages(filepath: str, start: int, stop: int) -> list[str]:
+    """Extract the text of pages [start, stop) of a PDF. Runs in a worker process."""
+    with open(filepath, "rb") as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [pdf_reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _page_count(filepath: str) -> int:
+    with open(filepath, "rb") as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+
+def iter_context_pages(pdf_filepaths: list[str], file_hashes: list[str] = None):
+    """
+    Yield the non-empty pages of the given PDFs as ContextPage, in file and page order.
+
+    Every uncached file is split into page ranges up front and the ranges are
+    extracted across the process pool, so later files are still being
+    extracted while an earlier one is consumed. `file_hashes` holds each
+    file's SHA-256 when already known (e.g. computed while the upload was
+    spooled); files without one are hashed here.
+
+    A file is all or nothing: its pages are yielded and cached only once every
+    one of its page ranges has been extracted. A file that cannot be read, or
+    one of whose ranges fails, is skipped with a warning and not cached.
+    """
+    file_hashes = file_hashes or [None] * len(pdf_filepaths)
+    plans = []
+    for filepath, key in zip(pdf_filepaths, file_hashes):
+        if not filepath.lower().endswith(".pdf"):
+            print(f"Warning: {filepath} is not a PDF file. Skipping.")
+            continue
+        try:
+            key = key or file_sha256(filepath)
+            cached = pdf_cache.get(key)
+            if cached is not None:
+                plans.append((filepath, key, json.loads(cached), None))
+                continue
+            count = _page_count(filepath)
+            futures = [
+                _get_pool().submit(_extract_pages, filepath, start, min(start + PDF_PAGES_PER_TASK, count))
+                for start in range(0, count, PDF_PAGES_PER_TASK)
+            ]
+            plans.append((filepath, key, None, futures))
+        except Exception as e:
+            print(f"Error processing {filepath}: {str(e)}")
+
+    for filepath, key, pages, futures in plans:
+        if futures is not None:
+            try:
+                pages = [text for future in futures for text in future.result()]
+            except Exception as e:
+                print(f"Error processing {filepath}, skipping the whole file: {str(e)}")
+                continue
+            pdf_cache.set(key, json.dumps(pages))
+
+        filename = os.path.basename(filepath)
+        for page_num, text in enumerate(pages):
+            if text:
+                yield ContextPage(filename, page_num + 1, text)
+
+
+def format_context_pages(pages) -> str:
+    """Render context pages as the "Content from <file>:" / "[Page N]" text the prompts use."""
+    all_content = []
+    current = None
+    for page in pages:
+        if page.filename != current:
+            current = page.filename
+            all_content.append([f"Content from {page.filename}:"])
+        all_content[-1].append(f"[Page {page.page}] {page.text}")
+
+    # Combine all content with clear separators
+    return "\n\n" + "-" * 40 + "\n\n".join("\n".join(content) for content in all_content)
@@ -0,0 +1,46 @@
+from myflaskapp.llm.chat import get_chat_prompt
+
+# ------------ PROMPT ASSEMBLY ------------ #
+# OpenAI reuses the longest prompt prefix it has seen recently (past the first
+# 1024 tokens), which bills those tokens at a discount and shortens the time
+# to the first token. Revision and chat prompts are therefore laid out as:
+#
+#   1. instructions shared by every call on a session (the chat prompt)
+#   2. session-constant material: the aligned transcript and additional context
+#   3. the task's own fixed instructions
+#   4. variable content: summaries, excerpts, sections, the request itself
+#
+# The revisions and chat turns of a session then all start with the same
+# transcript prefix, and anything that changes from call to call comes last.
+# The summary keeps its own guidelines as its first, governing message and
+# only reuses the transcript and context messages.
+
+
+def transcript_messages(transcript: str, additional_context: str = "") -> list:
+    """The aligned transcript and additional context as system messages."""
+    return [
+        {"role": "system", "content": transcript},
+        {
+            "role": "system",
+            "content": f"Additional Context: {additional_context}" if additional_context
+            else "No additional context provided.",
+        },
+    ]
+
+
+def session_context_messages(transcript: str, additional_context: str = "") -> list:
+    """The system messages every chat and revision starts with: chat prompt, transcript and context."""
+    return [{"role": "system", "content": get_chat_prompt()}] + transcript_messages(transcript, additional_context)
+
+
+def split_session_context(messages: list):
+    """Split a message list into its leading system messages and the conversation after them."""
+    count = 0
+    while count < len(messages) and messages[count]["role"] == "system":
+        count += 1
+    return list(messages[:count]), list(messages[count:])
+
+
+def session_context(messages: list) -> list:
+    """The leading system messages of a stored conversation: the session context plus the initial summary."""
+    return split_session_context(messages)[0]
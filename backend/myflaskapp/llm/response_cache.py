@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+from myflaskapp.llm.disk_cache import DiskCache
+
+load_dotenv()
+
+# ------------ LLM RESPONSE CACHE ------------ #
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_HOURS", "24")) * 60 * 60
+LLM_CACHE_MEMORY_MB = int(os.getenv("LLM_CACHE_MEMORY_MB", "64"))
+# optional second tier on local disk, shared by every worker process on the host
+LLM_CACHE_DISK = os.getenv("LLM_CACHE_DISK", "0") == "1"
+LLM_CACHE_DISK_MB = int(os.getenv("LLM_CACHE_DISK_MB", "256"))
+# bump to invalidate every stored response, e.g. after changing how they are stored
+CACHE_VERSION = 1
+# request parameters that do not change what the model returns
+UNKEYED_PARAMS = {"stream", "stream_options", "timeout", "extra_headers", "user"}
+# cached streams are replayed in chunks of this many characters
+REPLAY_CHUNK_CHARS = 64
+# only complete answers are stored, never ones cut off by max_tokens ("length"),
+# a content filter or a dropped stream, which a retry could complete
+CACHEABLE_FINISH_REASONS = ("stop",)
+
+
+def _normalize_content(content):
+    if isinstance(content, str):
+        # prompts are indented triple-quoted strings; trailing whitespace never matters
+        return "\n".join(line.rstrip() for line in content.strip().splitlines())
+    return content
+
+
+def cache_key(kwargs: dict) -> str:
+    """SHA-256 of the model, the normalized messages and the remaining chat.completions parameters."""
+    messages = [
+        {**message, "content": _normalize_content(message.get("content"))}
+        for message in kwargs["messages"]
+    ]
+    params = {name: value for name, value in kwargs.items() if name not in UNKEYED_PARAMS and name != "messages"}
+    payload = json.dumps(
+        {"version": CACHE_VERSION, "messages": messages, "params": params},
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryLRU:
+    """Thread-safe in-process LRU of text values with a byte budget (UTF-8 size) and a time to live."""
+
+    def __init__(self, max_bytes: int, max_age_seconds: float):
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        # key -> (stored_at, value, size in bytes)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value, _ = entry
+            if time.monotonic() - stored_at > self.max_age_seconds:
+                self._pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str):
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (time.monotonic(), value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def _pop(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ResponseCache:
+    """
+    Completed chat responses keyed by cache_key, in memory and optionally on disk.
+
+    Values are stored as {"model", "content", "finish_reason"} JSON, so a
+    response recorded from a stream can answer a plain call and the other way
+    round. Hits from disk are copied into memory.
+    """
+
+    def __init__(self, memory: MemoryLRU, disk: DiskCache = None):
+        self.memory = memory
+        self.disk = disk
+        self.hits = 0
+        self.misses = 0
+        # request threads look up responses concurrently
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, model: str, content: str, finish_reason: str):
+        if finish_reason not in CACHEABLE_FINISH_REASONS or content is None:
+            return
+        value = json.dumps({"model": model, "content": content, "finish_reason": finish_reason})
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self.memory), "hits": self.hits, "misses": self.misses}
+
+
+response_cache = ResponseCache(
+    MemoryLRU(LLM_CACHE_MEMORY_MB * 1024 * 1024, LLM_CACHE_TTL_SECONDS),
+    DiskCache(
+        "llm_responses",
+        max_bytes=LLM_CACHE_DISK_MB * 1024 * 1024,
+        max_age_seconds=LLM_CACHE_TTL_SECONDS,
+    ) if LLM_CACHE_DISK else None,
+)
+
+
+def completion_from_cache(key: str, cached: dict) -> ChatCompletion:
+    """A ChatCompletion carrying the cached answer, for callers reading `choices[0].message.content`."""
+    return ChatCompletion.model_validate({
+        "id": f"cached-{key[:16]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": cached["model"],
+        "choices": [{
+            "index": 0,
+            "finish_reason": cached["finish_reason"],
+            "message": {"role": "assistant", "content": cached["content"]},
+        }],
+    })
+
+
+def replay_stream(key: str, cached: dict):
+    """Yield ChatCompletionChunks replaying the cached answer, as a live stream would."""
+    content = cached["content"]
+    for start in range(0, len(content), REPLAY_CHUNK_CHARS):
+        yield _chunk(key, cached["model"], content[start:start + REPLAY_CHUNK_CHARS], None)
+    yield _chunk(key, cached["model"], None, cached["finish_reason"])
+
+
+def _chunk(key, model, content, finish_reason):
+    return ChatCompletionChunk.model_validate({
+        "id": f"cached-{key[:16]}",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "finish_reason": finish_reason, "delta": {"content": content}}],
+    })
+
+
+def record_stream(key: str, stream):
+    """Pass a live stream through, storing the answer once it has been read to the end."""
+    pieces = []
+    model = finish_reason = None
+    try:
+        for chunk in stream:
+            if chunk and getattr(chunk, "choices", None):
+                model = chunk.model
+                choice = chunk.choices[0]
+                pieces.append(getattr(choice.delta, "content", "") or "")
+                finish_reason = choice.finish_reason or finish_reason
+            yield chunk
+    finally:
+        # a reader that stops early must still free the stream's scheduler slot
+        stream.close()
+    response_cache.set(key, model, "".join(pieces), finish_reason)
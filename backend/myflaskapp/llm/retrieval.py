@@ -0,0 +1,106 @@
+import math
+import re
+from collections import Counter
+
+from myflaskapp.llm.turns import parse_aligned_turns, format_aligned_turn, format_timestamp
+from myflaskapp.llm.tokens import estimate_tokens
+
+# ------------ TRANSCRIPT RETRIEVAL ------------ #
+
+MIN_CHUNK_WORDS = 60  # short turns are merged with the ones after them
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by did do does for from had has have he her his i if in into is it its "
+    "me my of on or our she so that the their them then there they this to was we were what when "
+    "where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens with common stopwords removed."""
+    return [token for token in re.findall(r"\w+", text.lower()) if token not in STOPWORDS]
+
+
+def build_index(aligned_transcript: str, context_pages=()) -> list[dict]:
+    """
+    Split the session's transcript and additional context into retrievable chunks.
+
+    Transcript chunks follow speaker turns (short turns are merged with the
+    ones after them) and context chunks are the pages from
+    pdf_context.iter_context_pages. The returned list is
+    JSON-serializable so it can be stored with the session.
+    """
+    chunks = []
+
+    _, turns = parse_aligned_turns(aligned_transcript)
+    group = []
+    for turn in turns:
+        group.append(turn)
+        if sum(len(t.text.split()) for t in group) >= MIN_CHUNK_WORDS:
+            chunks.append(_transcript_chunk(group))
+            group = []
+    if group:
+        chunks.append(_transcript_chunk(group))
+
+    for filename, page, text in context_pages:
+        chunks.append({"source": filename, "ref": f"Page {page}", "text": text.strip()})
+
+    return chunks
+
+
+def _transcript_chunk(turns: list) -> dict:
+    return {
+        "source": "transcript",
+        "ref": format_timestamp(turns[0].start),
+        "text": "\n\n".join(format_aligned_turn(turn) for turn in turns),
+    }
+
+
+class BM25Index:
+    """Okapi BM25 ranking over the chunks produced by build_index."""
+
+    def __init__(self, chunks: list[dict]):
+        self.chunks = chunks
+        self.term_counts = [Counter(tokenize(chunk["text"])) for chunk in chunks]
+        self.lengths = [sum(counts.values()) for counts in self.term_counts]
+        self.average_length = sum(self.lengths) / len(chunks) if chunks else 0
+        document_frequency = Counter()
+        for counts in self.term_counts:
+            document_frequency.update(counts.keys())
+        total = len(chunks)
+        self.idf = {
+            term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def search(self, query: str, k: int) -> list[dict]:
+        """Return up to `k` chunks ranked by relevance to `query`."""
+        terms = set(tokenize(query))
+        scores = []
+        for i, counts in enumerate(self.term_counts):
+            score = 0.0
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[i] / (self.average_length or 1))
+            for term in terms:
+                tf = counts.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+            if score > 0:
+                scores.append((score, i))
+        scores.sort(reverse=True)
+        return [self.chunks[i] for _, i in scores[:k]]
+
+
+def format_excerpts(chunks: list[dict], max_tokens: int) -> str:
+    """Render retrieved chunks as one system message body, within a token budget."""
+    excerpts = []
+    used = 0
+    for chunk in chunks:
+        label = "Transcript" if chunk["source"] == "transcript" else chunk["source"]
+        excerpt = f"[{label}, {chunk['ref']}]\n{chunk['text']}"
+        used += estimate_tokens(excerpt)
+        if excerpts and used > max_tokens:
+            break
+        excerpts.append(excerpt)
+    return "\n\n---\n\n".join(excerpts)
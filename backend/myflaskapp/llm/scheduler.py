@@ -0,0 +1,134 @@
+import os
+import threading
+import time
+from collections import deque
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ------------ LLM REQUEST SCHEDULER ------------ #
+
+# highest priority first: chat turns, then revisions, then the summarize pipeline
+PRIORITIES = ("interactive", "revision", "batch")
+# calls of each class allowed in flight at once, per process
+CLASS_CONCURRENCY = {
+    "interactive": int(os.getenv("LLM_CONCURRENCY_INTERACTIVE", "32")),
+    "revision": int(os.getenv("LLM_CONCURRENCY_REVISION", "8")),
+    "batch": int(os.getenv("LLM_CONCURRENCY_BATCH", "8")),
+}
+# share of the account's OpenAI rate limits this process may use
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "300000"))
+# waits kept for the stats
+WAIT_SAMPLES = 200
+
+
+class TokenBucket:
+    """A budget of `per_minute` units that refills continuously."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.level = float(per_minute)
+        self.rate = per_minute / 60
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available; requests larger than the bucket only wait for a full one."""
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return max(missing, 0) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+
+class LLMScheduler:
+    """
+    Orders LLM calls by priority class within per-class concurrency and shared rate budgets.
+
+    A call waits until it is first in its class's queue, its class has a free
+    slot, no higher class has a call that could start, and the request and
+    token buckets can cover it. Batch work can therefore never hold up a chat
+    turn for more than one in-flight call, while each class's own limit keeps
+    any one of them from taking every slot.
+    """
+
+    def __init__(self, concurrency: dict, requests_per_minute: int, tokens_per_minute: int):
+        self.concurrency = concurrency
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._queues = {priority: deque() for priority in PRIORITIES}
+        self._running = {priority: 0 for priority in PRIORITIES}
+        self._completed = {priority: 0 for priority in PRIORITIES}
+        self._waits = {priority: deque(maxlen=WAIT_SAMPLES) for priority in PRIORITIES}
+        self._cond = threading.Condition()
+
+    def acquire(self, priority: str, tokens: int = 0):
+        """Block until a call of class `priority` estimated at `tokens` tokens may start."""
+        ticket = object()
+        queued_at = time.monotonic()
+        with self._cond:
+            queue = self._queues[priority]
+            queue.append(ticket)
+            try:
+                while True:
+                    delay = self._delay(priority, ticket, tokens)
+                    if delay == 0:
+                        break
+                    self._cond.wait(timeout=delay)
+            except BaseException:
+                queue.remove(ticket)
+                self._cond.notify_all()
+                raise
+            queue.popleft()
+            self._running[priority] += 1
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self._waits[priority].append(time.monotonic() - queued_at)
+            self._cond.notify_all()
+
+    def release(self, priority: str):
+        with self._cond:
+            self._running[priority] -= 1
+            self._completed[priority] += 1
+            self._cond.notify_all()
+
+    def _delay(self, priority, ticket, tokens):
+        """0 if the call can start now, else how long to wait (None: until another call finishes)."""
+        if self._queues[priority][0] is not ticket or self._running[priority] >= self.concurrency[priority]:
+            return None
+        for higher in PRIORITIES[:PRIORITIES.index(priority)]:
+            if self._queues[higher] and self._running[higher] < self.concurrency[higher]:
+                return None
+        return max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+
+    def stats(self) -> dict:
+        """Queue depth, calls in flight and recent wait times per class, plus the remaining budgets."""
+        with self._cond:
+            classes = {}
+            for priority in PRIORITIES:
+                waits = self._waits[priority]
+                classes[priority] = {
+                    "queued": len(self._queues[priority]),
+                    "running": self._running[priority],
+                    "limit": self.concurrency[priority],
+                    "completed": self._completed[priority],
+                    "avg_wait_seconds": round(sum(waits) / len(waits), 3) if waits else 0,
+                    "max_wait_seconds": round(max(waits), 3) if waits else 0,
+                }
+            self.requests._refill()
+            self.tokens._refill()
+            return {
+                "classes": classes,
+                "requests_available": int(self.requests.level),
+                "tokens_available": int(self.tokens.level),
+            }
+
+
+scheduler = LLMScheduler(CLASS_CONCURRENCY, LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE)
@@ -0,0 +1,54 @@
+import re
+from collections import namedtuple
+
+# ------------ SUMMARY SECTIONS ------------ #
+
+# one heading-2 section of a summary; `content` includes the "## " heading line
+Section = namedtuple("Section", ["heading", "content"])
+
+SECTION_HEADING = re.compile(r"^## +(.+?)\s*$", re.MULTILINE)
+
+
+def split_sections(summary: str):
+    """
+    Split a summary into the text before the first heading 2 and its heading-2 sections.
+
+    Returns:
+        tuple[str, list[Section]]: The title and introduction, then the sections in order
+    """
+    matches = list(SECTION_HEADING.finditer(summary))
+    if not matches:
+        return summary.strip(), []
+
+    preamble = summary[:matches[0].start()].strip()
+    sections = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(summary)
+        sections.append(Section(match.group(1), summary[match.start():end].strip()))
+    return preamble, sections
+
+
+def join_sections(preamble: str, sections: list) -> str:
+    """Reassemble a summary split by split_sections."""
+    parts = [preamble] if preamble else []
+    parts.extend(section.content for section in sections if section.content)
+    return "\n\n".join(parts)
+
+
+# heading for a new section the model wrote without one
+NEW_SECTION_HEADING = "Additional Details"
+
+
+def section_from_text(text: str, heading: str = NEW_SECTION_HEADING) -> Section:
+    """
+    Build a Section from generated markdown.
+
+    Text that does not start with a "## " heading gets `heading` (the heading of
+    the section it replaces), so it is not merged into the previous section the
+    next time the summary is split.
+    """
+    text = text.strip()
+    match = SECTION_HEADING.match(text)
+    if match:
+        return Section(match.group(1), text)
+    return Section(heading, f"## {heading}\n\n{text}")
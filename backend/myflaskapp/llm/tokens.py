@@ -0,0 +1,45 @@
+# ------------ TOKEN ESTIMATES ------------ #
+
+# English text averages roughly four characters per GPT-4o token
+CHARS_PER_TOKEN = 4
+# per-message overhead of the chat format (role and separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in `text` without calling the tokenizer."""
+    return len(text or "") // CHARS_PER_TOKEN + 1
+
+
+def estimate_message_tokens(messages: list) -> int:
+    """Estimate the prompt tokens of a list of chat messages."""
+    return sum(
+        estimate_tokens(message.get("content", "")) + MESSAGE_OVERHEAD_TOKENS
+        for message in messages
+    )
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut `text` down to about `max_tokens` tokens, marking where it was cut."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars] + "\n[... truncated ...]"
+
+
+def split_to_tokens(text: str, max_tokens: int) -> list[str]:
+    """Split `text` into pieces of at most about `max_tokens` tokens, at line breaks where possible."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces, current, size = [], [], 0
+    for line in text.splitlines():
+        # a single line longer than a piece is cut into piece-sized parts
+        for start in range(0, max(len(line), 1), max_chars):
+            part = line[start:start + max_chars]
+            if current and size + len(part) > max_chars:
+                pieces.append("\n".join(current))
+                current, size = [], 0
+            current.append(part)
+            size += len(part) + 1
+    if current:
+        pieces.append("\n".join(current))
+    return [piece for piece in pieces if piece.strip()]
@@ -0,0 +1,70 @@
+import re
+from bisect import bisect_right
+from myflaskapp.llm.turns import ALIGNED_SPEAKER_LINE, parse_timestamp
+
+# ------------ TRANSCRIPT TURN INDEX ------------ #
+
+# entry fields, kept as plain lists so the index is compact JSON
+START, SPEAKER, BEGIN, END = range(4)
+
+CITATION = re.compile(r"^\[?\s*(\d{1,2}(?::\d{1,2}){1,2})\s*\]?$")
+
+
+def build_turn_index(aligned_transcript: str) -> list[list]:
+    """
+    Index the speaker turns of an aligned transcript for lookups by time.
+
+    Returns one [start seconds, speaker, begin, end] entry per turn, sorted by
+    start time, where `aligned_transcript[begin:end]` is the turn's text
+    without the `**Speaker [hh:mm:ss]:**` heading.
+    """
+    entries = []
+    offset = 0
+    for line in aligned_transcript.splitlines(keepends=True):
+        match = ALIGNED_SPEAKER_LINE.match(line.strip())
+        if match:
+            if entries:
+                entries[-1][END] = _trimmed_end(aligned_transcript, entries[-1][BEGIN], offset)
+            # the text starts after the heading, on the same line or the next one
+            rest = match.group("rest")
+            begin = offset + line.rindex(rest) if rest else offset + len(line)
+            entries.append([parse_timestamp(match.group("start")), match.group("speaker"), begin, None])
+        offset += len(line)
+    if entries:
+        entries[-1][END] = _trimmed_end(aligned_transcript, entries[-1][BEGIN], offset)
+
+    # the model can emit the odd turn out of order; a stable sort keeps ties in transcript order
+    entries.sort(key=lambda entry: entry[START])
+    return entries
+
+
+def _trimmed_end(text: str, begin: int, end: int) -> int:
+    while end > begin and text[end - 1].isspace():
+        end -= 1
+    return end
+
+
+def _start(entry) -> int:
+    return entry[START]
+
+
+def parse_seek_time(value: str):
+    """Parse "hh:mm:ss", "[hh:mm:ss]" or plain seconds into seconds, or None if malformed."""
+    value = (value or "").strip()
+    if value.isdigit():
+        return int(value)
+    match = CITATION.match(value)
+    return parse_timestamp(match.group(1)) if match else None
+
+
+def turns_in_range(index: list, start: int, end: int) -> list:
+    """Entries for the turns that overlap [start, end], including the one already under way at `start`."""
+    first = max(bisect_right(index, start, key=_start) - 1, 0)
+    last = bisect_right(index, end, key=_start)
+    return index[first:last]
+
+
+def turns_around(index: list, seconds: int, before: int = 2, after: int = 2) -> list:
+    """Entries for the turn being spoken at `seconds` plus `before` and `after` neighbouring turns."""
+    current = max(bisect_right(index, seconds, key=_start) - 1, 0)
+    return index[max(current - before, 0):current + after + 1]
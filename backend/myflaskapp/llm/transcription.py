@@ -0,0 +1,108 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+from myflaskapp.llm.llm_clients import call_llm
+from myflaskapp.llm.disk_cache import DiskCache, file_sha256
+
+load_dotenv()
+
+# ------------ TRANSCRIPTION ENGINE ------------ #
+
+TRANSCRIBE_MODEL = "gpt-4o-transcribe"
+TRANSCRIBE_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", "4"))
+TRANSCRIBE_MAX_RETRIES = int(os.getenv("TRANSCRIBE_MAX_RETRIES", "3"))
+
+# transcriptions keyed by the SHA-256 of the audio they were produced from
+transcription_cache = DiskCache(
+    "transcriptions",
+    max_bytes=int(os.getenv("TRANSCRIPTION_CACHE_MAX_MB", "512")) * 1024 * 1024,
+    max_age_seconds=float(os.getenv("TRANSCRIPTION_CACHE_MAX_AGE_DAYS", "30")) * 24 * 60 * 60,
+)
+
+
+class TranscriptionError(RuntimeError):
+    """Raised when one or more chunks could not be transcribed.
+
+    `transcripts` holds the chunks that did succeed (None for the failed ones),
+    in chunk order, and `failed` maps each failed chunk index to its error.
+    """
+
+    def __init__(self, failed: dict, transcripts: list):
+        self.failed = failed
+        self.transcripts = transcripts
+        indexes = ", ".join(str(i) for i in sorted(failed))
+        super().__init__(
+            f"Failed to transcribe {len(failed)} of {len(transcripts)} chunks: {indexes}"
+        )
+
+
+def transcribe_file(client, audio_path: str) -> str:
+    """Transcribe a single audio file with gpt-4o-transcribe."""
+    with open(audio_path, "rb") as audio_file:
+        return client.audio.transcriptions.create(
+            model=TRANSCRIBE_MODEL,
+            file=audio_file,
+            response_format="text",
+        )
+
+
+def transcribe_with_retry(audio_path: str, max_retries: int = TRANSCRIBE_MAX_RETRIES) -> str:
+    """Transcribe a file, retrying rate limits and upstream failures as llm_clients.call_llm does."""
+    return call_llm("transcribe", lambda client: transcribe_file(client, audio_path), max_retries)
+
+
+def transcribe_chunks(
+    chunk_paths: list[str],
+    max_workers: int = TRANSCRIBE_WORKERS,
+    max_retries: int = TRANSCRIBE_MAX_RETRIES,
+) -> list[str]:
+    """
+    Transcribe audio chunks concurrently and return the texts in chunk order.
+
+    Chunks already in the transcription cache are not sent again, and every
+    chunk that succeeds is cached right away, so re-running after a partial
+    failure only transcribes the chunks that are still missing.
+
+    Args:
+        chunk_paths (list[str]): Paths to the audio chunks, in playback order
+        max_workers (int): Maximum number of chunks transcribed at once
+        max_retries (int): Retries per chunk before it is reported as failed
+
+    Returns:
+        list[str]: One transcription per chunk, ordered by chunk index
+
+    Raises:
+        TranscriptionError: If any chunk still fails after its retries
+    """
+    transcripts = [None] * len(chunk_paths)
+    chunk_hashes = [file_sha256(path) for path in chunk_paths]
+    failed = {}
+
+    pending = []
+    for i, chunk_hash in enumerate(chunk_hashes):
+        transcripts[i] = transcription_cache.get(chunk_hash)
+        if transcripts[i] is None:
+            pending.append(i)
+    if len(pending) < len(chunk_paths):
+        print(f"Reusing {len(chunk_paths) - len(pending)} cached chunk transcriptions")
+
+    workers = max(1, min(max_workers, len(pending)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(transcribe_with_retry, chunk_paths[i], max_retries): i
+            for i in pending
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                transcripts[i] = future.result()
+                transcription_cache.set(chunk_hashes[i], transcripts[i])
+                print(f"Transcribed chunk {i + 1}/{len(chunk_paths)}")
+            except Exception as e:
+                print(f"Error transcribing chunk {i}: {e}")
+                failed[i] = e
+
+    if failed:
+        raise TranscriptionError(failed, transcripts)
+
+    return transcripts
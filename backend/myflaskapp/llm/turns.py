@@ -0,0 +1,152 @@
+import re
+from collections import namedtuple
+
+# ------------ TRANSCRIPT TURNS ------------ #
+
+# one speaker turn; `start` is the offset into the interview in seconds
+Turn = namedtuple("Turn", ["speaker", "start", "text"])
+
+TIMESTAMP = r"\d{1,2}(?::\d{1,2}){1,2}(?:\.\d+)?"
+
+# Teams DOCX export: "Jane Doe   1:02:03" on its own line, text on the following lines; the
+# name and time are separated by a tab or several spaces, unlike speech ending in a time ("around 5:30")
+TEAMS_SPEAKER_LINE = re.compile(rf"^(?P<speaker>\S.*?)(?:\t|\s{{2,}})\s*(?P<start>{TIMESTAMP})$")
+# a "speaker" with sentence punctuation, or too many words for a name, is a line of speech
+SENTENCE_PUNCTUATION = re.compile(r"[?!;\"“”…]|[.,]\s+[a-z]|[.,:]$")
+MAX_SPEAKER_WORDS = 8
+# older Teams export: "0:0:3.120 --> 0:0:6.50" then the speaker, then the text
+TEAMS_CUE_LINE = re.compile(rf"^(?P<start>{TIMESTAMP})\s*-->\s*{TIMESTAMP}$")
+# aligned transcript: "**Jane Doe [01:02:03]:**" followed by the text
+ALIGNED_SPEAKER_LINE = re.compile(r"^\*\*(?P<speaker>.+?) \[(?P<start>\d{2}:\d{2}:\d{2})\]:\*\*\s*(?P<rest>.*)$")
+
+
+def parse_timestamp(timestamp: str) -> int:
+    """Convert "h:mm:ss", "mm:ss" or "h:m:s.fff" into whole seconds."""
+    seconds = 0.0
+    for part in timestamp.split(":"):
+        seconds = seconds * 60 + float(part)
+    return int(seconds)
+
+
+def format_timestamp(seconds: int) -> str:
+    """Format seconds as hh:mm:ss."""
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def parse_teams_turns(transcript: str):
+    """
+    Split a Teams transcript into its preamble and speaker turns.
+
+    Args:
+        transcript (str): Text from parse_transcript, one paragraph per line
+
+    Returns:
+        tuple[str, list[Turn]]: The lines before the first turn (title, date,
+        duration) and the turns in order. No turns are returned if the text
+        does not follow either Teams export format.
+    """
+    return parse_teams_lines(transcript.splitlines())
+
+
+def parse_teams_lines(lines):
+    """Like parse_teams_turns, but consumes an iterable of lines in a single pass."""
+    preamble = []
+    turns = []
+    speaker, start, text = None, None, []
+    cue_start = None  # start time of a cue line, the speaker is on the next line
+
+    def flush():
+        if speaker is not None:
+            turns.append(Turn(speaker, start, " ".join(text)))
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if cue_start is not None:
+            flush()
+            speaker, start, text = line, cue_start, []
+            cue_start = None
+            continue
+        cue = TEAMS_CUE_LINE.match(line)
+        if cue:
+            cue_start = parse_timestamp(cue.group("start"))
+            continue
+        header = _speaker_header(line, start)
+        if header:
+            flush()
+            speaker, start, text = header
+        elif speaker is None:
+            preamble.append(line)
+        else:
+            text.append(line)
+    flush()
+
+    return "\n".join(preamble), turns
+
+
+def _speaker_header(line: str, previous_start):
+    """(speaker, start, []) if `line` is a Teams speaker heading no earlier than `previous_start`, else None."""
+    match = TEAMS_SPEAKER_LINE.match(line)
+    if not match:
+        return None
+    speaker = match.group("speaker").strip()
+    if SENTENCE_PUNCTUATION.search(speaker) or len(speaker.split()) > MAX_SPEAKER_WORDS:
+        return None
+    start = parse_timestamp(match.group("start"))
+    # turns are exported in order, so a time before the previous turn's is part of the text
+    if previous_start is not None and start < previous_start:
+        return None
+    return speaker, start, []
+
+
+def parse_aligned_turns(transcript: str):
+    """
+    Split an aligned transcript into its header and speaker turns.
+
+    Returns:
+        tuple[str, list[Turn]]: The header lines (interviewee, date, duration)
+        and the turns in the `**Speaker [hh:mm:ss]:**` format.
+    """
+    header = []
+    turns = []
+    speaker, start, text = None, None, []
+
+    for line in transcript.splitlines():
+        match = ALIGNED_SPEAKER_LINE.match(line.strip())
+        if match:
+            if speaker is not None:
+                turns.append(Turn(speaker, start, "\n".join(text).strip()))
+            speaker, start = match.group("speaker"), parse_timestamp(match.group("start"))
+            text = [match.group("rest")] if match.group("rest") else []
+        elif speaker is None:
+            if line.strip():
+                header.append(line.strip())
+        else:
+            text.append(line)
+    if speaker is not None:
+        turns.append(Turn(speaker, start, "\n".join(text).strip()))
+
+    return "\n".join(header), turns
+
+
+def format_teams_turn(turn: Turn) -> str:
+    """Render a turn the way the Teams export lays it out."""
+    return f"{turn.speaker}   {format_timestamp(turn.start)}\n{turn.text}"
+
+
+def format_aligned_turn(turn: Turn) -> str:
+    """Render a turn in the aligned `**Speaker [hh:mm:ss]:**` format."""
+    return f"**{turn.speaker} [{format_timestamp(turn.start)}]:**\n{turn.text}"
+
+
+def window_turns(turns: list, window_seconds: int) -> list:
+    """Group consecutive turns into windows spanning at most `window_seconds` each."""
+    windows = []
+    for turn in turns:
+        if windows and turn.start - windows[-1][0].start < window_seconds:
+            windows[-1].append(turn)
+        else:
+            windows.append([turn])
+    return windows
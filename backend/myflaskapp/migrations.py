@@ -0,0 +1,60 @@
+from sqlalchemy import inspect, text
+
+# ------------ SCHEMA UPGRADES ------------ #
+# db.create_all() creates missing tables but never alters existing ones, so the
+# columns and indexes added to existing tables since they were first released
+# are added here. Every statement is plain SQL that both PostgreSQL and
+# SQLite accept, and each one is skipped when the database already has it, so
+# upgrade_schema can run on every deploy.
+
+# (table, column, column definition)
+ADDED_COLUMNS = [
+    # retrieval chunks for chat prompts, see retrieval.build_index
+    ("session_model", "retrieval_index", "JSON"),
+    # system messages shared by every chat of the session
+    ("session_model", "context", "JSON"),
+    # time-sorted transcript turn index, see transcript_index.build_turn_index
+    ("session_model", "transcript_turns", "JSON"),
+    ("session_model", "default_chat_id", "INTEGER REFERENCES chat_model (id) ON DELETE SET NULL"),
+    # running digest of older chat messages, see Session.compact_history
+    ("chat_model", "digest", "TEXT DEFAULT ''"),
+    ("chat_model", "digest_count", "INTEGER DEFAULT 0"),
+    # background job liveness, see app.heartbeat_jobs
+    ("job_model", "heartbeat_at", "FLOAT"),
+]
+
+# (table, index, statement)
+ADDED_INDEXES = [
+    (
+        "chat_model", "ix_chat_model_session_name",
+        "CREATE INDEX IF NOT EXISTS ix_chat_model_session_name ON chat_model (session_id, name)",
+    ),
+]
+
+
+def upgrade_statements(connection) -> list[str]:
+    """The ALTER TABLE / CREATE INDEX statements the database behind `connection` still needs."""
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+    statements = []
+    existing = {}
+    for table, column, definition in ADDED_COLUMNS:
+        if table not in tables:
+            # create_all makes the whole table, new columns included
+            continue
+        if table not in existing:
+            existing[table] = {info["name"] for info in inspector.get_columns(table)}
+        if column not in existing[table]:
+            statements.append(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    for table, index, statement in ADDED_INDEXES:
+        if table in tables and index not in {info["name"] for info in inspector.get_indexes(table)}:
+            statements.append(statement)
+    return statements
+
+
+def upgrade_schema(engine):
+    """Bring a database created by an earlier version up to the current models; safe to re-run."""
+    with engine.begin() as connection:
+        for statement in upgrade_statements(connection):
+            print(f"Schema upgrade: {statement}")
+            connection.execute(text(statement))
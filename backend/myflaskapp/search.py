@@ -0,0 +1,83 @@
+import re
+from sqlalchemy import DDL, event, text
+
+# ------------ FULL-TEXT SEARCH ------------ #
+# Search documents (transcript turns, summaries and chat messages) live in the
+# search_document table. Postgres searches them through a GIN expression index
+# on to_tsvector(body); SQLite, used for local development, mirrors them into an
+# FTS5 table kept in sync by triggers. Only the SQL differs between the two.
+
+SEARCH_LANGUAGE = "english"
+SNIPPET_START, SNIPPET_STOP = "<mark>", "</mark>"
+
+POSTGRES_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_search_document_body_tsv ON search_document "
+    f"USING gin (to_tsvector('{SEARCH_LANGUAGE}', body))",
+]
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+    "body, content='search_document', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS search_document_ai AFTER INSERT ON search_document BEGIN "
+    "INSERT INTO search_fts(rowid, body) VALUES (new.id, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_document_ad AFTER DELETE ON search_document BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, body) VALUES ('delete', old.id, old.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_document_au AFTER UPDATE ON search_document BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+    "INSERT INTO search_fts(rowid, body) VALUES (new.id, new.body); END",
+]
+
+POSTGRES_SEARCH = text(f"""
+    SELECT d.session_id, s.name AS session_name, d.kind, d.ref, d.chat_id,
+           ts_headline('{SEARCH_LANGUAGE}', d.body, q,
+                       'StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, MaxWords=30, MinWords=10, MaxFragments=2') AS snippet
+    FROM search_document d
+    JOIN session_model s ON s.id = d.session_id
+    JOIN user_sessions us ON us.session_id = d.session_id AND us.user_id = :user_id,
+         websearch_to_tsquery('{SEARCH_LANGUAGE}', :query) q
+    WHERE to_tsvector('{SEARCH_LANGUAGE}', d.body) @@ q
+    ORDER BY ts_rank_cd(to_tsvector('{SEARCH_LANGUAGE}', d.body), q) DESC, d.id
+    LIMIT :limit OFFSET :offset
+""")
+
+SQLITE_SEARCH = text(f"""
+    SELECT d.session_id, s.name AS session_name, d.kind, d.ref, d.chat_id,
+           snippet(search_fts, 0, '{SNIPPET_START}', '{SNIPPET_STOP}', '...', 24) AS snippet
+    FROM search_fts
+    JOIN search_document d ON d.id = search_fts.rowid
+    JOIN session_model s ON s.id = d.session_id
+    JOIN user_sessions us ON us.session_id = d.session_id AND us.user_id = :user_id
+    WHERE search_fts MATCH :query
+    ORDER BY bm25(search_fts), d.id
+    LIMIT :limit OFFSET :offset
+""")
+
+
+def install_search_index(table):
+    """Create the dialect's full-text index whenever `table` (search_document) is created."""
+    for statement in POSTGRES_DDL:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+    for statement in SQLITE_DDL:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+
+def sqlite_match_query(query: str) -> str:
+    """Turn free text into an FTS5 query matching all of its words, so punctuation is never parsed as syntax."""
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+", query))
+
+
+def search_documents(session, query: str, user_id: int, limit: int, offset: int = 0) -> list:
+    """
+    Rank the search documents of the sessions `user_id` is subscribed to against `query`.
+
+    Returns rows with session_id, session_name, kind, ref, chat_id and a
+    snippet with the matches wrapped in SNIPPET_START / SNIPPET_STOP.
+    """
+    params = {"user_id": user_id, "limit": limit, "offset": offset}
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        match = sqlite_match_query(query)
+        if not match:
+            return []
+        return session.execute(SQLITE_SEARCH, {**params, "query": match}).all()
+    return session.execute(POSTGRES_SEARCH, {**params, "query": query}).all()
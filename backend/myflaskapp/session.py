@@ -1,20 +1,75 @@
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from myflaskapp.llm.interview_summarizer import (
-    parse_transcript, parse_recording, align_transcripts, 
+    parse_recording, align_transcripts, 
     generate_summary, initial_greeting, 
-    generate_revision, parse_additional_context
+    generate_revision, parse_context_pages, plan_revision, revise_section
 )
-from myflaskapp.llm.chat import get_chat_prompt, stream_response
+from myflaskapp.llm.chat import (
+    stream_response, build_retrieval_context, compact_conversation
+)
+from myflaskapp.llm.context_window import fit_messages, messages_to_fold
+from myflaskapp.llm.docx_transcript import read_teams_transcript
+from myflaskapp.llm.pdf_context import format_context_pages
+from myflaskapp.llm.prompts import session_context, session_context_messages
+from myflaskapp.llm.retrieval import build_index, BM25Index, format_excerpts
+from myflaskapp.llm.summary_sections import split_sections, join_sections, section_from_text
 
 
 class Session:
 
-    def __init__(self, name="Untitled", summary="", transcript="", messages=None):
+    def __init__(
+        self, name="Untitled", summary="", transcript="", messages=None, index=None,
+        digest="", digest_count=0,
+    ):
         self.name = name
         self.summary = summary
         self.transcript = transcript
         self.messages = list(messages) if messages else []
+        # retrieval chunks of the transcript and additional context, see retrieval.build_index
+        self.index = index
+        # compacted summary of the first `digest_count` non-system chat messages
+        self.digest = digest or ""
+        self.digest_count = digest_count or 0
+        # seconds spent in each summarize stage
+        self.timings = {}
+
+    def summarize(
+        self, transcript: str, recording: str, additional_context: list[str] = [], on_stage=None,
+        recording_hash: str = None, on_stage_done=None, context_hashes: list[str] = None,
+    ):
+        """
+        Ingest the files and stream the summary.
+
+        `on_stage(name)` is called as each stage starts and `on_stage_done(name)`
+        once it has finished; stages running side by side can therefore be
+        running at the same time. Both are always called from the thread
+        iterating this generator. `recording_hash` and `context_hashes` are the
+        SHA-256 of the recording and of each context file when already known,
+        which saves hashing them again.
+        """
+        def stage(name, message):
+            print(message)
+            if on_stage:
+                on_stage(name)
+
+        def stage_done(name):
+            if on_stage_done:
+                on_stage_done(name)
+
+        # stages running on the executor, reported as they finish
+        running = {}
+
+        def wait_for(*futures):
+            needed = [future for future in futures if future is not None]
+            while any(not future.done() for future in needed):
+                wait(running, return_when=FIRST_COMPLETED)
+                for future in [future for future in running if future.done()]:
+                    stage_done(running.pop(future))
+            for future in [future for future in running if future.done()]:
+                stage_done(running.pop(future))
 
-    def summarize(self, transcript: str, recording: str, additional_context: list[str] = []):
         assert transcript.lower().endswith(
             ".docx"
         ), "Transcript file must be a .docx file."
@@ -24,72 +79,125 @@ class Session:
             for context_file in additional_context:
                 assert context_file.lower().endswith('.pdf'), "Additional context files must be .pdf files."
         
-        # parse transcript and recording
-        print("Parsing transcript...")
-        og_transcript = parse_transcript(transcript)
-        print("Transcribing recording...")
-        whisper_transcript = parse_recording(recording)
-
-        # align transcripts
-        print("Aligning transcripts...")
-        aligned_transcript = align_transcripts(og_transcript, whisper_transcript)
-        self.transcript = aligned_transcript
-
-        self.messages.append({"role": "system", "content": get_chat_prompt()})
-        self.messages.append(
-            {"role": "system", "content": aligned_transcript}
-        )
-        
-        # parse additional context
-        additional_context_concat = ""
-        if additional_context:
-            print("Parsing additional context...")
-            additional_context_concat = parse_additional_context(additional_context)
-            
-            # add additional context to chat
-            self.messages.append(
-                {"role": "system", "content": f"Additional Context: {additional_context_concat}"}
-            )
-        else:
-            self.messages.append(
-                {"role": "system", "content": f"No additional context provided."}
+        # transcript parsing, transcription, PDF extraction and the greeting are
+        # independent, so they run side by side; alignment starts as soon as both
+        # transcripts are ready and only the summary waits on the PDF context
+        self.timings = {}
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            stage("parsing_transcript", "Parsing transcript...")
+            transcript_future = executor.submit(self._timed, "parsing_transcript", read_teams_transcript, transcript)
+            running[transcript_future] = "parsing_transcript"
+            stage("transcribing", "Transcribing recording...")
+            recording_future = executor.submit(self._timed, "transcribing", parse_recording, recording, recording_hash)
+            running[recording_future] = "transcribing"
+            context_future = None
+            if additional_context:
+                stage("parsing_context", "Parsing additional context...")
+                context_future = executor.submit(
+                    self._timed, "parsing_context", parse_context_pages, additional_context, context_hashes
+                )
+                running[context_future] = "parsing_context"
+            greeting_future = executor.submit(self._timed, "greeting", initial_greeting)
+
+            wait_for(transcript_future, recording_future)
+            og_transcript = transcript_future.result()
+            whisper_transcript = recording_future.result()
+
+            # align transcripts
+            stage("aligning", "Aligning transcripts...")
+            aligned_transcript = self._timed(
+                "aligning", align_transcripts,
+                og_transcript.text, whisper_transcript, (og_transcript.preamble, og_transcript.turns),
             )
+            self.transcript = aligned_transcript
+            stage_done("aligning")
+
+            wait_for(context_future)
+            context_pages = context_future.result() if context_future else []
+            additional_context_concat = format_context_pages(context_pages) if context_pages else ""
+
+        # chat prompt, transcript and additional context, the prefix every revision and chat starts with
+        self.messages.extend(session_context_messages(aligned_transcript, additional_context_concat))
+
+        # index transcript turns and context pages for chat retrieval
+        self.index = build_index(aligned_transcript, context_pages)
 
         # generate summary
-        print("Generating summary...")
+        stage("summarizing", "Generating summary...")
+        started = time.perf_counter()
         for chunk in generate_summary(aligned_transcript, additional_context_concat):
             # add summary to chat
             self.summary += chunk
             yield chunk
+        self.timings["summarizing"] = time.perf_counter() - started
+        stage_done("summarizing")
 
         self.messages.append(
             {"role": "system", "content": f"Initial Summary: {self.summary}"}
         )
 
-        # initial message
-        greeting = initial_greeting()
-        self.messages.append({"role": "assistant", "content": greeting})
+        # initial message, generated while the transcripts were being prepared
+        self.messages.append({"role": "assistant", "content": greeting_future.result()})
+
+        print("Stage timings: " + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in self.timings.items()))
+
+    def _timed(self, name, fn, *args):
+        """Run one ingestion stage and record how long it took in `self.timings`."""
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.timings[name] = time.perf_counter() - started
+            print(f"Stage {name} finished in {self.timings[name]:.1f}s")
 
     def prompt_chat(self, prompt: str):
         # add user message to conversation
         self.messages.append({"role": "user", "content": prompt})
+        # sessions with a retrieval index only send the excerpts relevant to the question
+        if self.index:
+            system_messages, excerpt_messages = build_retrieval_context(self.messages, self.summary, self.index)
+        else:
+            system_messages = [message for message in self.messages if message["role"] == "system"]
+            excerpt_messages = []
+        conversation = [message for message in self.messages if message["role"] != "system"]
+        context = fit_messages(
+            system_messages, conversation[self.digest_count:], self.digest, turn_messages=excerpt_messages
+        )
         # get response in a streaming manner
         response = ""
-        for chunk in stream_response(self.messages):
+        for chunk in stream_response(context):
             # add assistant message to conversation
             response += chunk
             yield chunk
         # add final response to conversation
         self.messages.append({"role": "assistant", "content": response})
 
+    def needs_compaction(self) -> bool:
+        """Whether compact_history would fold anything into the digest."""
+        return messages_to_fold(self._undigested()) > 0
+
+    def compact_history(self):
+        """
+        Fold older chat turns into the digest once the undigested history gets too long.
+
+        This makes a blocking GPT-4o call, so /chat runs it after the response has been sent.
+        """
+        undigested = self._undigested()
+        fold = messages_to_fold(undigested)
+        if not fold:
+            return
+        print(f"Compacting {fold} chat messages into the digest...")
+        self.digest = compact_conversation(self.digest, undigested[:fold])
+        self.digest_count += fold
+
+    def _undigested(self):
+        conversation = [message for message in self.messages if message["role"] != "system"]
+        return conversation[self.digest_count:]
+
     def revise(self, request: str):
-        # initial system prompt, transcript, additional context, and summary
-        system_messages = self.messages[:4]
-        # most recent summary
-        system_messages.append(
-            {"role": "system", "content": f"Most Recent Summary: {self.summary}"}
-        )
-        # revision system prompt
+        # initial system prompt, transcript, additional context, and initial summary
+        system_messages = session_context(self.messages)
+        # revision system prompt, the same for every revision so it stays in the cached prefix
         system_messages.append(
             {
                 "role": "system",
@@ -119,6 +227,10 @@ class Session:
                 """,
             }
         )
+        # most recent summary
+        system_messages.append(
+            {"role": "system", "content": f"Most Recent Summary: {self.summary}"}
+        )
 
         # revision request
         system_messages.append(
@@ -132,3 +244,57 @@ class Session:
             # add revision to chat
             self.summary += chunk
             yield chunk
+
+    def revise_sections(self, request: str):
+        """
+        Revise only the heading-2 sections the request touches.
+
+        Yields "REVISION_MODE::sections" followed by one "SECTION_PATCH::{json}"
+        line per changed section, or "REVISION_MODE::full" followed by the whole
+        revised summary when the request affects the summary as a whole.
+        """
+        preamble, sections = split_sections(self.summary)
+        plan = plan_revision(preamble, [section.heading for section in sections], request) if sections else None
+        if plan is None:
+            yield "REVISION_MODE::full\n"
+            yield from self.revise(request)
+            return
+
+        yield "REVISION_MODE::sections\n"
+
+        # only the parts of the transcript relevant to each section are sent when an index exists
+        def excerpts_for(section_text):
+            if not self.index:
+                return ""
+            return format_excerpts(BM25Index(self.index).search(f"{request} {section_text}", 8), 6000)
+
+        # the whole session context when the transcript is sent, else just the chat prompt
+        context_messages = session_context(self.messages) if not self.index else self.messages[:1]
+
+        jobs = [("replace", i, sections[i].content) for i in plan["sections"]]
+        if plan["insert_after"] is not None:
+            jobs.append(("insert", plan["insert_after"] + 1, ""))
+
+        def run(job):
+            _, _, section_text = job
+            return revise_section(
+                context_messages, self.summary, section_text, request, excerpts_for(section_text)
+            )
+
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            results = list(executor.map(run, jobs))
+
+        revised = list(sections)
+        inserted = None
+        for (op, index, _), text in zip(jobs, results):
+            if op == "replace":
+                section = section_from_text(text, sections[index].heading)
+                revised[index] = section
+            else:
+                section = section_from_text(text)
+                inserted = (index, section)
+            yield "SECTION_PATCH::" + json.dumps({"op": op, "index": index, "content": section.content}) + "\n"
+        if inserted:
+            revised.insert(*inserted)
+
+        self.summary = join_sections(preamble, revised)
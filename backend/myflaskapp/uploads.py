@@ -0,0 +1,117 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from flask import Request, request
+from werkzeug.utils import secure_filename
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ------------ UPLOAD SPOOLING ------------ #
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "fair-uploads"))
+# largest request body accepted, uploads included; larger requests get a 413
+MAX_UPLOAD_MB = int(os.getenv("MAX_UPLOAD_MB", "2048"))
+
+
+class SpooledUpload:
+    """
+    An uploaded file written straight into the request's spool directory.
+
+    The SHA-256 of the content is computed while the upload is being written,
+    so the caches keyed by it never have to read the file again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "w+b")
+        self._digest = hashlib.sha256()
+
+    def write(self, data):
+        self._digest.update(data)
+        return self._file.write(data)
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+    def __iter__(self):
+        return iter(self._file)
+
+
+class SpoolingRequest(Request):
+    """
+    Request that spools file uploads into a directory of its own.
+
+    Every request gets a fresh directory under UPLOAD_DIR, so two users
+    uploading files with the same name never touch each other's files. The
+    directory is removed when the request closes, unless a streamed response
+    has taken it over with remove_spool_on_close().
+    """
+
+    spool_dir = None
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.spool_dir is None:
+            os.makedirs(UPLOAD_DIR, exist_ok=True)
+            self.spool_dir = tempfile.mkdtemp(prefix="upload-", dir=UPLOAD_DIR)
+        return SpooledUpload(_unique_path(self.spool_dir, filename))
+
+    def detach_spool(self):
+        """Return the spool directory and stop the request from removing it on close."""
+        spool_dir, self.spool_dir = self.spool_dir, None
+        return spool_dir
+
+    def close(self):
+        super().close()
+        if self.spool_dir is not None:
+            shutil.rmtree(self.spool_dir, ignore_errors=True)
+            self.spool_dir = None
+
+
+def remove_spool_on_close(response):
+    """
+    Keep the current request's uploads until `response` is closed, then remove them.
+
+    The request closes as soon as the view returns, before a streamed body has
+    been generated. The WSGI server closes the response once the stream ends or
+    the client disconnects, so the files are removed either way.
+    """
+    spool_dir = request.detach_spool()
+    if spool_dir is not None:
+        response.call_on_close(lambda: shutil.rmtree(spool_dir, ignore_errors=True))
+    return response
+
+
+def _unique_path(directory: str, filename: str) -> str:
+    """Keep the uploaded name (it is shown to the model), numbering repeats within one request."""
+    name = secure_filename(filename or "") or "upload"
+    stem, ext = os.path.splitext(name)
+    path = os.path.join(directory, name)
+    n = 1
+    while os.path.exists(path):
+        path = os.path.join(directory, f"{stem}-{n}{ext}")
+        n += 1
+    return path
+
+
+def upload_path(file_storage) -> str:
+    """Return where a spooled upload was written."""
+    return file_storage.stream.path
+
+
+def upload_sha256(file_storage) -> str:
+    """Return the SHA-256 of a spooled upload, computed while it arrived."""
+    return file_storage.stream.sha256
+
+
+def move_upload(file_storage, directory: str) -> str:
+    """Move a spooled upload out of the request's spool directory so it outlives the request."""
+    file_storage.stream.flush()
+    destination = _unique_path(directory, os.path.basename(upload_path(file_storage)))
+    shutil.move(upload_path(file_storage), destination)
+    return destination
@@ -0,0 +1,74 @@
+import os
+import pytest
+
+# the app reads these when it is imported; TEST_DATABASE_URL runs the tests against e.g. Postgres
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_GPT4O_API_KEY", "test")
+os.environ["LLM_CACHE_ENABLED"] = "0"
+
+from myflaskapp.app import app as flask_app, db, save_session, UserModel  # noqa: E402
+from myflaskapp.llm.prompts import session_context_messages  # noqa: E402
+from myflaskapp.llm.retrieval import build_index  # noqa: E402
+from myflaskapp.session import Session  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    with flask_app.app_context():
+        db.create_all()
+    yield flask_app
+    with flask_app.app_context():
+        db.session.remove()
+        db.drop_all()
+        # the FTS5 table is not part of the models' metadata
+        db.session.execute(db.text("DROP TABLE IF EXISTS search_fts"))
+        db.session.commit()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+TRANSCRIPT = """**Interviewee: Jane Doe**
+**Interview Date: January 5, 2024**
+**Duration: 12m 30s**
+
+**Investigator [00:00:05]:**
+Can you describe what happened at the leasing office?
+
+**Jane Doe [00:00:12]:**
+The landlord refused to rent me the apartment after he saw my wheelchair.
+
+**Jane Doe [00:01:40]:**
+He said the building was not suitable and asked me to look elsewhere."""
+
+SUMMARY = """# Interview with Jane Doe
+
+Jane Doe applied for an apartment in January 2024.
+
+## Leasing Office Visit
+The landlord refused to rent the apartment after seeing the wheelchair [00:00:12]."""
+
+
+@pytest.fixture
+def user_id(app):
+    with app.app_context():
+        user = UserModel(username="investigator")
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+@pytest.fixture
+def session_id(app, user_id):
+    """A summarized session saved the way /summarize saves it."""
+    session = Session(name="Jane Doe intake", summary=SUMMARY, transcript=TRANSCRIPT)
+    session.messages = session_context_messages(TRANSCRIPT, "") + [
+        {"role": "system", "content": f"Initial Summary: {SUMMARY}"},
+        {"role": "assistant", "content": "Hello, how can I help with this interview?"},
+    ]
+    session.index = build_index(TRANSCRIPT)
+    with app.app_context():
+        record, _ = save_session(user_id, session)
+        return record.id
@@ -0,0 +1,69 @@
+import io
+import time
+
+import pytest
+
+from myflaskapp import app as app_module
+from myflaskapp.app import db, JobModel
+from myflaskapp.jobs import JOB_STALE_SECONDS
+
+
+@pytest.fixture
+def job_id(app, user_id):
+    with app.app_context():
+        job = JobModel(user_id=user_id, name="1234: Jane Doe", status="running", heartbeat_at=time.time())
+        db.session.add(job)
+        db.session.commit()
+        return job.id
+
+
+def test_jobs_are_only_visible_to_their_user(client, user_id, job_id):
+    assert client.get(f"/jobs/{user_id}/{job_id}").json["status"] == "running"
+
+    assert client.get(f"/jobs/{user_id + 1}/{job_id}").status_code == 404
+    assert client.get(f"/jobs/{user_id + 1}/{job_id}/stream").status_code == 404
+
+
+def test_jobs_without_heartbeats_are_failed(app, client, user_id, job_id):
+    with app.app_context():
+        db.session.get(JobModel, job_id).heartbeat_at = time.time() - JOB_STALE_SECONDS - 1
+        db.session.commit()
+
+    # the stream ends instead of polling a job nothing is running any more
+    body = client.get(f"/jobs/{user_id}/{job_id}/stream").get_data(as_text=True)
+
+    assert body.startswith("JOB_ERROR::")
+    job = client.get(f"/jobs/{user_id}/{job_id}").json
+    assert job["status"] == "failed"
+    assert "interrupted" in job["error"]
+
+
+def test_heartbeat_keeps_tracked_jobs_alive(app, job_id, monkeypatch):
+    monkeypatch.setattr(app_module, "active_jobs", {job_id})
+    with app.app_context():
+        db.session.get(JobModel, job_id).heartbeat_at = 0
+        db.session.commit()
+
+        app_module.heartbeat_jobs()
+
+        db.session.expire_all()
+        assert time.time() - db.session.get(JobModel, job_id).heartbeat_at < 5
+
+
+def test_failed_upload_moves_leave_no_job(app, client, user_id, monkeypatch):
+    def move_upload(file_storage, directory):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(app_module, "move_upload", move_upload)
+    monkeypatch.setitem(app.config, "PROPAGATE_EXCEPTIONS", False)
+
+    response = client.post(f"/jobs/summarize/{user_id}", data={
+        "case_number": "1234",
+        "interviewee_name": "Jane Doe",
+        "transcript": (io.BytesIO(b"docx"), "transcript.docx"),
+        "recording": (io.BytesIO(b"mp4"), "recording.mp4"),
+    })
+
+    assert response.status_code == 500
+    with app.app_context():
+        assert JobModel.query.count() == 0
@@ -0,0 +1,216 @@
+import openai
+import pytest
+
+from myflaskapp.llm import llm_clients
+from myflaskapp.llm.llm_clients import CircuitBreaker, CircuitOpenError, call_llm
+
+try:
+    import httpx2 as httpx
+except ImportError:
+    import httpx
+
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+def status_error(error_class, status, headers=None):
+    response = httpx.Response(status, headers=headers or {}, request=REQUEST)
+    return error_class(f"HTTP {status}", response=response, body=None)
+
+
+class FakeClock:
+    """Stands in for the time module; sleeping just moves the clock forward."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.held = 0
+        self.on_acquire = None
+
+    def acquire(self, priority, tokens=0):
+        if self.on_acquire:
+            hook, self.on_acquire = self.on_acquire, None
+            hook()
+        self.held += 1
+
+    def release(self, priority):
+        self.held -= 1
+
+
+class FakeRandom:
+    @staticmethod
+    def random():
+        # jitter factor 0.5 + 0.5: the plain exponential backoff
+        return 0.5
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_clients, "time", clock)
+    monkeypatch.setattr(llm_clients, "random", FakeRandom)
+    return clock
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    scheduler = FakeScheduler()
+    monkeypatch.setattr(llm_clients, "scheduler", scheduler)
+    return scheduler
+
+
+@pytest.fixture
+def breaker(monkeypatch, clock):
+    breaker = CircuitBreaker(failures=5, reset_seconds=30)
+    monkeypatch.setattr(llm_clients, "breaker", breaker)
+    return breaker
+
+
+def calls(*outcomes):
+    """A fake API call returning or raising each outcome in turn, counting the attempts."""
+    outcomes = list(outcomes)
+    attempts = []
+
+    def fn(client):
+        attempts.append(client)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    fn.attempts = attempts
+    return fn
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.failures):
+        breaker.record_failure()
+
+
+def test_retryable_errors_back_off_exponentially(clock, scheduler, breaker):
+    fn = calls(
+        status_error(openai.InternalServerError, 500),
+        openai.APIConnectionError(request=REQUEST),
+        "ok",
+    )
+
+    assert call_llm("chat", fn, max_retries=3) == "ok"
+    assert len(fn.attempts) == 3
+    assert clock.sleeps == [llm_clients.LLM_BACKOFF_SECONDS, 2 * llm_clients.LLM_BACKOFF_SECONDS]
+    assert scheduler.held == 0
+
+
+def test_gives_up_after_max_retries(clock, scheduler, breaker):
+    error = status_error(openai.InternalServerError, 503)
+    fn = calls(error, error, error)
+
+    with pytest.raises(openai.InternalServerError):
+        call_llm("chat", fn, max_retries=2)
+    assert len(fn.attempts) == 3
+    assert scheduler.held == 0
+
+
+@pytest.mark.parametrize("headers, delay", [
+    ({"retry-after": "7"}, 7),
+    ({"retry-after-ms": "2500"}, 2.5),
+    ({"retry-after": "Thu, 01 Jan 1970 00:16:50 GMT"}, 10),
+    # never longer than the backoff cap
+    ({"retry-after": "3600"}, llm_clients.LLM_MAX_BACKOFF_SECONDS),
+])
+def test_retry_after_sets_the_delay(clock, scheduler, breaker, headers, delay):
+    fn = calls(status_error(openai.RateLimitError, 429, headers), "ok")
+
+    assert call_llm("chat", fn, max_retries=1) == "ok"
+    assert clock.sleeps == [pytest.approx(delay)]
+
+
+@pytest.mark.parametrize("error_class, status", [
+    (openai.BadRequestError, 400),
+    (openai.AuthenticationError, 401),
+    (openai.NotFoundError, 404),
+])
+def test_client_errors_fail_immediately(clock, scheduler, breaker, error_class, status):
+    fn = calls(status_error(error_class, status), "ok")
+
+    with pytest.raises(error_class):
+        call_llm("chat", fn, max_retries=3)
+    assert len(fn.attempts) == 1
+    assert clock.sleeps == []
+    assert scheduler.held == 0
+
+
+def test_breaker_opens_after_consecutive_failures(clock, scheduler, breaker):
+    error = status_error(openai.InternalServerError, 500)
+    for _ in range(breaker.failures):
+        with pytest.raises(openai.InternalServerError):
+            call_llm("chat", calls(error), max_retries=0)
+
+    fn = calls("ok")
+    with pytest.raises(CircuitOpenError):
+        call_llm("chat", fn)
+    assert fn.attempts == []
+    assert scheduler.held == 0
+
+
+def test_rate_limits_do_not_open_the_breaker(clock, scheduler, breaker):
+    error = status_error(openai.RateLimitError, 429)
+    for _ in range(breaker.failures):
+        with pytest.raises(openai.RateLimitError):
+            call_llm("chat", calls(error), max_retries=0)
+
+    assert call_llm("chat", calls("ok")) == "ok"
+
+
+def test_half_open_trial_closes_or_reopens_the_breaker(clock, scheduler, breaker):
+    error = status_error(openai.InternalServerError, 500)
+    open_breaker(breaker)
+
+    # a failed trial re-opens the breaker for another full period
+    clock.now += 30
+    with pytest.raises(openai.InternalServerError):
+        call_llm("chat", calls(error), max_retries=0)
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        call_llm("chat", calls("ok"))
+
+    # a successful trial closes it
+    clock.now += 1
+    assert call_llm("chat", calls("ok")) == "ok"
+    assert call_llm("chat", calls("ok")) == "ok"
+
+
+def test_only_one_trial_runs_while_half_open(clock, breaker):
+    open_breaker(breaker)
+    clock.now += 30
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    breaker.before_call()
+
+
+def test_queued_call_does_not_hold_the_trial(clock, scheduler, breaker):
+    open_breaker(breaker)
+    clock.now += 30
+
+    # while the first call waits in the scheduler, another one is admitted and becomes the trial
+    admitted = []
+    scheduler.on_acquire = lambda: admitted.append(call_llm("chat", calls("second")))
+
+    assert call_llm("chat", calls("first")) == "first"
+    assert admitted == ["second"]
+    assert scheduler.held == 0
@@ -0,0 +1,13 @@
+from myflaskapp.llm.local_alignment import interview_header
+
+
+def test_interviewee_is_taken_from_the_title():
+    header = interview_header("Interview with Jane Doe\nJanuary 5, 2024")
+
+    assert "**Interviewee: Jane Doe**" in header
+
+
+def test_interviewee_is_not_guessed_without_a_title():
+    header = interview_header("Team meeting\n32m 10s")
+
+    assert "**Interviewee: N/A**" in header
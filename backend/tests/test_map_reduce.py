@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from myflaskapp.llm import interview_summarizer
+from myflaskapp.llm.tokens import CHARS_PER_TOKEN, split_to_tokens
+
+
+def test_split_to_tokens_breaks_at_lines():
+    text = "\n".join(f"line {i:02d} " + "x" * 30 for i in range(10))
+
+    pieces = split_to_tokens(text, 20)
+
+    assert len(pieces) == 5
+    assert all(len(piece) <= 20 * CHARS_PER_TOKEN for piece in pieces)
+    assert "\n".join(pieces) == text
+
+
+def test_split_to_tokens_cuts_overlong_lines():
+    pieces = split_to_tokens("y" * 250, 20)
+
+    assert [len(piece) for piece in pieces] == [80, 80, 80, 10]
+
+
+def fake_chat_completion(calls):
+    def chat_completion(operation, **kwargs):
+        calls.append(kwargs["messages"])
+        if kwargs.get("stream"):
+            delta = SimpleNamespace(content="# Interview with Jane Doe")
+            return iter([SimpleNamespace(choices=[SimpleNamespace(delta=delta)])])
+        message = SimpleNamespace(content=f"- note {len(calls)}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+    return chat_completion
+
+
+def test_transcript_without_turns_is_split_by_size(monkeypatch):
+    calls = []
+    monkeypatch.setattr(interview_summarizer, "chat_completion", fake_chat_completion(calls))
+    monkeypatch.setattr(interview_summarizer, "SUMMARY_SECTION_TOKENS", 100)
+    # an alignment that came back without any **Speaker [hh:mm:ss]:** lines
+    transcript = "\n".join(f"Sentence {i} about the apartment and the landlord." for i in range(60))
+
+    summary = "".join(interview_summarizer.generate_summary_map_reduce(transcript))
+
+    assert summary == "# Interview with Jane Doe"
+    *section_calls, reduce_call = calls
+    assert len(section_calls) > 1
+    for messages in section_calls:
+        prompt = "".join(message["content"] for message in messages)
+        assert len(prompt) < len(transcript)
+        assert "Interview Details:\n    Not available." in messages[0]["content"]
+    assert "Sentence 59" in section_calls[-1][1]["content"]
+    assert "Section Notes:" in reduce_call[0]["content"]
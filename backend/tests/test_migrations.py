@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import (
+    JSON, Column, DateTime, ForeignKey, Integer, MetaData, String, Table, Text, func, inspect, insert
+)
+
+from myflaskapp.app import db
+from myflaskapp.migrations import upgrade_schema, upgrade_statements
+
+# the tables as the first release created them
+first_release = MetaData()
+user_table = Table(
+    "user_model", first_release,
+    Column("id", Integer, primary_key=True),
+    Column("username", String(100), nullable=False, unique=True),
+)
+session_table = Table(
+    "session_model", first_release,
+    Column("id", Integer, primary_key=True),
+    Column("creator_id", Integer, ForeignKey("user_model.id"), nullable=False),
+    Column("name", String(100)),
+    Column("summary", Text),
+    Column("transcript", Text),
+)
+chat_table = Table(
+    "chat_model", first_release,
+    Column("id", Integer, primary_key=True),
+    Column("session_id", Integer, ForeignKey("session_model.id"), nullable=False),
+    Column("name", String(100)),
+    Column("messages", JSON),
+    Column("created_at", DateTime, server_default=func.current_timestamp()),
+)
+user_sessions_table = Table(
+    "user_sessions", first_release,
+    Column("user_id", Integer, ForeignKey("user_model.id"), primary_key=True),
+    Column("session_id", Integer, ForeignKey("session_model.id"), primary_key=True),
+)
+
+
+@pytest.fixture
+def first_release_db(app):
+    with app.app_context():
+        db.drop_all()
+        first_release.create_all(db.engine)
+        # ids are left to the database so Postgres sequences stay in step; each row gets id 1
+        with db.engine.begin() as connection:
+            connection.execute(insert(user_table).values(username="investigator"))
+            connection.execute(insert(session_table).values(
+                creator_id=1, name="Interview", summary="# Summary", transcript="**Jane Doe [00:00:01]:**\nhello"
+            ))
+            connection.execute(insert(user_sessions_table).values(user_id=1, session_id=1))
+            connection.execute(insert(chat_table).values(
+                session_id=1, name="default",
+                messages=[{"role": "system", "content": "prompt"}, {"role": "assistant", "content": "Hi"}],
+            ))
+    return app
+
+
+def test_upgrade_adds_the_new_columns_to_existing_tables(first_release_db, client):
+    with first_release_db.app_context():
+        db.create_all()
+        assert client.get("/load_session/1").status_code == 500
+
+        upgrade_schema(db.engine)
+
+        columns = {info["name"] for info in inspect(db.engine).get_columns("session_model")}
+        assert {"retrieval_index", "context", "transcript_turns", "default_chat_id"} <= columns
+        with db.engine.connect() as connection:
+            assert upgrade_statements(connection) == []
+
+    response = client.get("/load_session/1")
+    assert response.status_code == 200
+    assert response.json["messages"][-1] == {"role": "assistant", "content": "Hi"}
+    assert client.get("/get_chats/1").json == [{"id": 1, "name": "default"}]
+    assert client.post("/create_chat/1", json={"name": "Follow-up"}).status_code == 201
+
+
+def test_upgrade_is_a_no_op_on_a_new_database(app):
+    with app.app_context():
+        with db.engine.connect() as connection:
+            assert upgrade_statements(connection) == []
@@ -0,0 +1,23 @@
+from myflaskapp.llm import interview_summarizer
+
+
+class MemoryCache(dict):
+    def set(self, key, value):
+        self[key] = value
+
+
+def test_chunk_transcriptions_are_joined_with_spaces(monkeypatch, tmp_path):
+    cache = MemoryCache()
+    monkeypatch.setattr(interview_summarizer, "transcription_cache", cache)
+    monkeypatch.setattr(interview_summarizer.os.path, "getsize", lambda path: 100 * 1024 * 1024)
+    monkeypatch.setattr(interview_summarizer, "segment_audio", lambda path, directory: ["a.mp3", "b.mp3"])
+    # each chunk transcription ends and starts without whitespace, as the API returns them
+    monkeypatch.setattr(interview_summarizer, "transcribe_chunks", lambda paths: ["the landlord refused", "to rent"])
+
+    transcription = interview_summarizer.parse_recording(str(tmp_path / "interview.mp4"), "hash")
+
+    assert transcription == "the landlord refused to rent"
+    assert list(cache.values()) == [transcription]
+    # the next upload of the same recording is answered from the cache
+    monkeypatch.setattr(interview_summarizer, "transcribe_chunks", None)
+    assert interview_summarizer.parse_recording(str(tmp_path / "interview.mp4"), "hash") == transcription
@@ -0,0 +1,64 @@
+from concurrent.futures import Future
+
+import pytest
+
+from myflaskapp.llm import pdf_context
+from myflaskapp.llm.pdf_context import ContextPage, iter_context_pages
+
+
+class InlinePool:
+    """Runs page-range extraction in the test process, failing the ranges listed in `failing`."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+
+    def submit(self, fn, filepath, start, stop):
+        future = Future()
+        if (filepath, start) in self.failing:
+            future.set_exception(ValueError("broken page"))
+        else:
+            future.set_result(fn(filepath, start, stop))
+        return future
+
+
+class MemoryCache(dict):
+    def set(self, key, value):
+        self[key] = value
+
+
+@pytest.fixture
+def pdfs(monkeypatch):
+    """Two fake 20-page PDFs extracted in ranges of 16 pages, with an in-memory page cache."""
+    monkeypatch.setattr(pdf_context, "PDF_PAGES_PER_TASK", 16)
+    monkeypatch.setattr(pdf_context, "_page_count", lambda filepath: 20)
+    monkeypatch.setattr(
+        pdf_context, "_extract_pages", lambda filepath, start, stop: [f"page {i + 1}" for i in range(start, stop)]
+    )
+    monkeypatch.setattr(pdf_context, "pdf_cache", MemoryCache())
+
+    def file_sha256(filepath):
+        raise AssertionError(f"{filepath} was hashed again")
+
+    monkeypatch.setattr(pdf_context, "file_sha256", file_sha256)
+    return monkeypatch
+
+
+def test_known_hashes_are_not_recomputed(pdfs):
+    pdfs.setattr(pdf_context, "_get_pool", lambda: InlinePool())
+
+    pages = list(iter_context_pages(["/uploads/lease.pdf", "/uploads/notice.pdf"], ["hash-a", "hash-b"]))
+
+    assert len(pages) == 40
+    assert pages[0] == ContextPage("lease.pdf", 1, "page 1")
+    assert pages[-1] == ContextPage("notice.pdf", 20, "page 20")
+    assert set(pdf_context.pdf_cache) == {"hash-a", "hash-b"}
+
+
+def test_a_failed_range_skips_the_whole_file(pdfs):
+    pdfs.setattr(pdf_context, "_get_pool", lambda: InlinePool(failing=[("/uploads/lease.pdf", 16)]))
+
+    pages = list(iter_context_pages(["/uploads/lease.pdf", "/uploads/notice.pdf"], ["hash-a", "hash-b"]))
+
+    # none of lease.pdf, not even its first range, and it is not cached
+    assert {page.filename for page in pages} == {"notice.pdf"}
+    assert set(pdf_context.pdf_cache) == {"hash-b"}
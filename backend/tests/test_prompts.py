@@ -0,0 +1,35 @@
+from myflaskapp.llm import interview_summarizer
+from myflaskapp.llm.chat import get_chat_prompt
+from myflaskapp.llm.prompts import session_context_messages, split_session_context
+
+
+def test_summary_is_governed_by_its_guidelines(monkeypatch):
+    calls = []
+
+    def chat_completion(operation, **kwargs):
+        calls.append(kwargs)
+        return iter([])
+
+    monkeypatch.setattr(interview_summarizer, "chat_completion", chat_completion)
+
+    list(interview_summarizer.generate_summary("**Jane Doe [00:00:01]:**\nhello", "lease.pdf"))
+
+    messages = calls[0]["messages"]
+    assert messages[0] == {"role": "system", "content": interview_summarizer.SUMMARY_GUIDELINES}
+    assert all(message["content"] != get_chat_prompt() for message in messages)
+    # the transcript and context messages are the ones chats and revisions send
+    assert messages[1:] == session_context_messages("**Jane Doe [00:00:01]:**\nhello", "lease.pdf")[1:]
+
+
+def test_split_session_context():
+    messages = [
+        {"role": "system", "content": "prompt"},
+        {"role": "system", "content": "transcript"},
+        {"role": "assistant", "content": "Hi"},
+        {"role": "system", "content": "later"},
+    ]
+
+    context, conversation = split_session_context(messages)
+
+    assert context == messages[:2]
+    assert conversation == messages[2:]
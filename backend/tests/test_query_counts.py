@@ -0,0 +1,86 @@
+import os
+import re
+import pytest
+from sqlalchemy import event
+
+from myflaskapp.app import db
+import myflaskapp.session
+
+
+@pytest.fixture
+def statements(app, session_id):
+    """SQL statements executed by the test's requests, once the session has been saved."""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(" ".join(statement.split()))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+# Postgres batches the INSERTs of several rows into one statement, so the /chat counts are SQLite's
+sqlite_only = pytest.mark.skipif(
+    not os.environ["DATABASE_URL"].startswith("sqlite"), reason="statement counts are pinned for SQLite"
+)
+
+
+def loads_transcript(statements):
+    return any(re.search(r"session_model\.transcript\b", statement) for statement in statements)
+
+
+@sqlite_only
+def test_chat(client, session_id, statements, monkeypatch):
+    monkeypatch.setattr(myflaskapp.session, "stream_response", lambda messages: iter(["The landlord ", "refused."]))
+
+    response = client.post(f"/chat/{session_id}", json={"message": "What did the landlord say?"})
+
+    assert response.get_data(as_text=True) == "The landlord refused."
+    # session, default chat, context, message rows, summary and index; then, once the
+    # stream ends, the chat again, its last position, two messages and their search documents
+    assert len(statements) == 11
+    assert sum(statement.startswith("INSERT INTO message_model") for statement in statements) == 2
+    # answered from the retrieval index, the transcript stays in the database
+    assert not loads_transcript(statements)
+
+
+@sqlite_only
+def test_chat_with_history_does_not_add_queries(client, session_id, statements, monkeypatch):
+    monkeypatch.setattr(myflaskapp.session, "stream_response", lambda messages: iter(["Yes."]))
+    for i in range(3):
+        client.post(f"/chat/{session_id}", json={"message": f"Question {i}"}).get_data()
+    statements.clear()
+
+    client.post(f"/chat/{session_id}", json={"message": "One more question"}).get_data()
+
+    assert len(statements) == 11
+
+
+def test_load_session(client, session_id, statements):
+    response = client.get(f"/load_session/{session_id}")
+
+    assert response.status_code == 200
+    assert response.json["messages"][-1]["role"] == "assistant"
+    # session, its chats (the default chat comes from the identity map), context,
+    # message rows, and summary/transcript for the legacy response
+    assert len(statements) == 5
+
+
+def test_load_session_page_skips_the_transcript(client, session_id, statements):
+    response = client.get(f"/load_session/{session_id}?limit=20")
+
+    assert response.status_code == 200
+    assert not loads_transcript(statements)
+
+
+def test_create_chat(client, session_id, statements):
+    response = client.post(f"/create_chat/{session_id}", json={"name": "Follow-up"})
+
+    assert response.status_code == 201
+    # session, default chat, new chat, greeting row, last position, greeting copy
+    assert len(statements) == 6
+    assert not any("session_model.context" in statement for statement in statements)
+    assert not loads_transcript(statements)
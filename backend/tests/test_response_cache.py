@@ -0,0 +1,70 @@
+import threading
+from types import SimpleNamespace
+
+from myflaskapp.llm import interview_summarizer
+from myflaskapp.llm.response_cache import MemoryLRU, ResponseCache
+
+
+def new_cache():
+    return ResponseCache(MemoryLRU(1024 * 1024, 60))
+
+
+def test_complete_answers_are_cached():
+    cache = new_cache()
+    cache.set("key", "gpt-4o", "The full answer.", "stop")
+
+    assert cache.get("key") == {"model": "gpt-4o", "content": "The full answer.", "finish_reason": "stop"}
+
+
+def test_truncated_answers_are_not_cached():
+    cache = new_cache()
+    cache.set("length", "gpt-4o", "The answer was cut", "length")
+    cache.set("filtered", "gpt-4o", "", "content_filter")
+    cache.set("dropped", "gpt-4o", "The stream end", None)
+
+    assert cache.get("length") is None
+    assert cache.get("filtered") is None
+    assert cache.get("dropped") is None
+
+
+def test_memory_budget_counts_bytes_not_characters():
+    memory = MemoryLRU(max_bytes=100, max_age_seconds=60)
+    memory.set("first", "é" * 40)   # 80 bytes in UTF-8
+    memory.set("second", "é" * 20)  # another 40 bytes, so the first entry goes
+
+    assert memory.get("first") is None
+    assert memory.get("second") == "é" * 20
+
+    memory.set("too big", "é" * 51)
+    assert memory.get("too big") is None
+
+
+def test_hits_and_misses_are_counted_across_threads():
+    cache = new_cache()
+    cache.set("key", "gpt-4o", "answer", "stop")
+
+    def look_up():
+        for _ in range(1000):
+            cache.get("key")
+            cache.get("missing")
+
+    threads = [threading.Thread(target=look_up) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.stats() == {"entries": 1, "hits": 8000, "misses": 8000}
+
+
+def test_align_window_bypasses_the_cache(monkeypatch):
+    calls = []
+
+    def chat_completion(operation, **kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="aligned"))])
+
+    monkeypatch.setattr(interview_summarizer, "chat_completion", chat_completion)
+
+    assert interview_summarizer.align_window("teams", "whisper") == "aligned"
+    assert calls[0]["cache"] is False
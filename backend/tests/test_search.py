@@ -0,0 +1,89 @@
+from myflaskapp.app import db, SearchDocument, SessionModel, UserModel
+import myflaskapp.session
+
+
+def search(client, user_id, query, **params):
+    response = client.get(f"/search/{user_id}", query_string={"q": query, **params})
+    assert response.status_code == 200
+    return response.json
+
+
+def test_summarize_indexes_transcript_turns_and_summary(client, user_id, session_id):
+    results = search(client, user_id, "wheelchair")["results"]
+
+    assert {(result["kind"], result["ref"]) for result in results} == {("transcript", "00:00:12"), ("summary", None)}
+    assert all(result["session_id"] == session_id for result in results)
+    assert all(result["session_name"] == "Jane Doe intake" for result in results)
+
+
+def test_snippets_mark_the_matches(client, user_id, session_id):
+    results = search(client, user_id, "landlord refused")["results"]
+
+    assert results
+    for result in results:
+        assert "<mark>landlord</mark>" in result["snippet"]
+        assert "<mark>refused</mark>" in result["snippet"]
+
+
+def test_revise_replaces_the_summary_document(client, app, user_id, session_id, monkeypatch):
+    revised = "# Interview with Jane Doe\n\n## Deposit\nThe landlord kept the security deposit [00:01:40]."
+    monkeypatch.setattr(myflaskapp.session, "generate_revision", lambda messages: iter([revised]))
+
+    client.post(f"/revise/{session_id}", json={"revision": "Mention the deposit"}).get_data()
+
+    assert [result["kind"] for result in search(client, user_id, "deposit")["results"]] == ["summary"]
+    # the earlier summary is no longer searchable, the transcript turn still is
+    assert [result["kind"] for result in search(client, user_id, "wheelchair")["results"]] == ["transcript"]
+    with app.app_context():
+        assert SearchDocument.query.filter_by(session_id=session_id, kind="summary").count() == 1
+
+
+def test_chat_indexes_both_messages(client, app, user_id, session_id, monkeypatch):
+    monkeypatch.setattr(myflaskapp.session, "stream_response", lambda messages: iter(["The elevator ", "was broken."]))
+
+    client.post(f"/chat/{session_id}", json={"message": "Was the elevator working?"}).get_data()
+
+    results = search(client, user_id, "elevator")["results"]
+    with app.app_context():
+        chat_id = db.session.get(SessionModel, session_id).default_chat_id
+    assert [result["kind"] for result in results] == ["message", "message"]
+    assert {result["chat_id"] for result in results} == {chat_id}
+    assert all(result["ref"].isdigit() for result in results)
+
+
+def test_results_are_ranked_and_paged(client, app, user_id, session_id):
+    with app.app_context():
+        db.session.add_all([
+            SearchDocument(session_id=session_id, kind="message", ref="1", body="The deposit was mentioned once here."),
+            SearchDocument(session_id=session_id, kind="message", ref="2", body="Deposit, deposit and again the deposit."),
+        ])
+        db.session.commit()
+
+    assert [result["ref"] for result in search(client, user_id, "deposit")["results"]] == ["2", "1"]
+
+    first = search(client, user_id, "deposit", limit=1)
+    assert [result["ref"] for result in first["results"]] == ["2"]
+    second = search(client, user_id, "deposit", limit=1, offset=first["next_offset"])
+    assert [result["ref"] for result in second["results"]] == ["1"]
+    assert second["next_offset"] is None
+
+
+def test_only_subscribed_sessions_are_searched(client, app, session_id):
+    with app.app_context():
+        reviewer = UserModel(username="reviewer")
+        db.session.add(reviewer)
+        db.session.commit()
+        reviewer_id = reviewer.id
+
+    assert search(client, reviewer_id, "wheelchair")["results"] == []
+
+    client.post(f"/subscribe/{reviewer_id}/{session_id}")
+    assert len(search(client, reviewer_id, "wheelchair")["results"]) == 2
+
+    client.delete(f"/unsubscribe/{reviewer_id}/{session_id}")
+    assert search(client, reviewer_id, "wheelchair")["results"] == []
+
+
+def test_stray_search_syntax_is_not_an_error(client, user_id, session_id):
+    search(client, user_id, 'wheelchair" OR (NEAR')
+    assert len(search(client, user_id, '"wheelchair"!')["results"]) == 2
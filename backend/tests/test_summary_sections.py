@@ -0,0 +1,20 @@
+from myflaskapp.llm.summary_sections import join_sections, section_from_text, split_sections
+
+SUMMARY = "# Interview with Jane Doe\n\nIntro.\n\n## Background\nBorn in 1980 [00:01:00].\n\n## Incident\nIt happened [00:05:00]."
+
+
+def test_replaced_section_without_heading_keeps_the_original_heading():
+    preamble, sections = split_sections(SUMMARY)
+    sections[1] = section_from_text("It happened at noon [00:05:00].", sections[1].heading)
+
+    preamble, resplit = split_sections(join_sections(preamble, sections))
+
+    assert [section.heading for section in resplit] == ["Background", "Incident"]
+    assert resplit[1].content == "## Incident\n\nIt happened at noon [00:05:00]."
+
+
+def test_section_with_heading_is_kept_as_is():
+    section = section_from_text("## Renamed\nText.", "Incident")
+
+    assert section.heading == "Renamed"
+    assert section.content == "## Renamed\nText."
@@ -0,0 +1,41 @@
+from myflaskapp.llm.turns import Turn, parse_teams_turns
+
+
+def test_speech_ending_in_a_time_is_not_a_speaker_turn():
+    preamble, turns = parse_teams_turns(
+        "Interview with Jane Doe\n"
+        "Jane Doe   0:03\n"
+        "hello there I got there around 5:30\n"
+        "John Smith   0:15\n"
+        "And then what happened?\n"
+    )
+
+    assert preamble == "Interview with Jane Doe"
+    assert turns == [
+        Turn("Jane Doe", 3, "hello there I got there around 5:30"),
+        Turn("John Smith", 15, "And then what happened?"),
+    ]
+
+
+def test_speaker_headings_with_tabs_and_directory_names():
+    _, turns = parse_teams_turns("Doe, Jane\t0:03\nhello\nDr. Smith   1:02:03\nhi\n")
+
+    assert turns == [Turn("Doe, Jane", 3, "hello"), Turn("Dr. Smith", 3723, "hi")]
+
+
+def test_sentence_punctuation_and_earlier_times_stay_in_the_text():
+    _, turns = parse_teams_turns(
+        "Jane Doe   0:20\n"
+        "I left. then came back   0:45\n"
+        "Why not?   0:50\n"
+        "maybe  0:10\n"
+    )
+
+    assert len(turns) == 1
+    assert turns[0].text == "I left. then came back   0:45 Why not?   0:50 maybe  0:10"
+
+
+def test_cue_format():
+    _, turns = parse_teams_turns("0:0:3.120 --> 0:0:6.50\nJane Doe\nhello\n")
+
+    assert turns == [Turn("Jane Doe", 3, "hello")]